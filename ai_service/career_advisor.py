@@ -3,34 +3,362 @@ Career Advisor AI Module
 Generates personalized career roadmaps, learning paths, and advice
 """
 
+import asyncio
+import copy
+import functools
+import importlib
+import itertools
 import logging
 import os
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
+import random
+import re
+import sys
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Mapping, Final, FrozenSet, Tuple, AsyncIterator
 import json
 
-# Load environment variables
-load_dotenv()
+from json_extract import extract_json
+from keyword_matcher import KeywordMatcher
+from llm_cache import create_llm_cache, make_cache_key
 
-# Import OpenAI
+# Load environment variables from .env unless the environment is already configured
+if not os.getenv("USE_OPENAI"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Optional import - exact token counts for the chat history budget
 try:
-    import openai
-    OPENAI_AVAILABLE = True
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
 except ImportError:
-    OPENAI_AVAILABLE = False
-    logging.warning("OpenAI not available for career advisor")
+    TIKTOKEN_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing for concurrent chat sessions
+OPENAI_CONNECTION_LIMITS = {"max_connections": 200, "max_keepalive_connections": 100}
+
+# Upper bound (seconds) for a single retry backoff
+MAX_RETRY_DELAY = 30
+
+# Cache lifetimes (seconds) for completions and generated roadmaps
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))
+ROADMAP_CACHE_TTL = int(os.getenv("ROADMAP_CACHE_TTL", "86400"))
+
+# Batch metadata marking roadmap batches, whose custom_ids are roadmap cache keys
+ROADMAP_BATCH_KIND = "roadmap"
+
+_STRING = {"type": "string"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+
+# JSON schema enforced at decode time for AI roadmaps (OpenAI strict structured outputs)
+ROADMAP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "role": _STRING,
+        "timeline": _STRING,
+        "overview": _STRING,
+        "skill_gaps": _STRING_LIST,
+        "phases": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "phase": _STRING,
+                    "duration": _STRING,
+                    "skills": _STRING_LIST,
+                    "resources": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "title": _STRING,
+                                "type": _STRING,
+                                "url": _STRING,
+                                "duration": _STRING
+                            },
+                            "required": ["title", "type", "url", "duration"],
+                            "additionalProperties": False
+                        }
+                    },
+                    "projects": _STRING_LIST,
+                    "milestones": _STRING_LIST
+                },
+                "required": ["phase", "duration", "skills", "resources", "projects", "milestones"],
+                "additionalProperties": False
+            }
+        },
+        "certifications": _STRING_LIST,
+        "job_search_tips": _STRING_LIST,
+        "salary_range": _STRING,
+        "industry_trends": _STRING_LIST
+    },
+    "required": [
+        "role", "timeline", "overview", "skill_gaps", "phases", "certifications",
+        "job_search_tips", "salary_range", "industry_trends"
+    ],
+    "additionalProperties": False
+}
+
+ROADMAP_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "roadmap", "schema": ROADMAP_SCHEMA, "strict": True}
+}
+
+# Static coach instructions, sent first on every chat turn so OpenAI's automatic
+# prefix caching can reuse them; the per-profile context follows in its own message
+CHAT_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": sys.intern("""You are an expert AI Career Coach and Mentor. Your role is to:
+1. Analyze users' current skills and career goals
+2. Provide personalized career advice and roadmaps
+3. Suggest learning resources, certifications, and projects
+4. Help users understand skill gaps and how to bridge them
+5. Be encouraging, specific, and actionable
+
+Always provide:
+- Clear, actionable advice
+- Specific learning resources (courses, books, tutorials)
+- Project ideas to build skills
+- Timeline estimates for skill development
+- Industry insights and trends
+
+Be conversational, empathetic, and motivating.""")
+}
+
+# Routes requests sharing the static prefix to the same prompt cache
+CHAT_PROMPT_CACHE_KEY = "career-advisor-v1"
+
+# Chat history is trimmed to a token budget per turn; once a session grows past
+# the threshold, turns outside the window are folded into a rolling summary
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+HISTORY_SUMMARY_THRESHOLD = 20
+HISTORY_SUMMARY_CACHE_SIZE = 1024
+
+HISTORY_SUMMARY_PROMPT = (
+    "Summarize this career coaching conversation in under 150 words. Keep the "
+    "user's goals, current skills, decisions made and any open questions."
+)
+
+# Tokenizer for keyword lookups in chat messages
+_WORD_RE = re.compile(r"[a-z]+")
+
+_ROADMAP_WORDS = frozenset({"roadmap", "roadmaps", "path", "paths", "plan", "plans", "planning"})
+
+# Quick action suggestions and the message words that trigger them; labels are
+# interned so every response reuses the same string objects
+_SUGGEST_RULES = (
+    (sys.intern("Generate detailed roadmap"), _ROADMAP_WORDS),
+    (sys.intern("Find learning resources"), frozenset({"learn", "learning", "study", "studying", "course", "courses"})),
+    (sys.intern("Get project ideas"), frozenset({"project", "projects", "build", "building", "practice", "practicing"})),
+    (sys.intern("Analyze skill gaps"), frozenset({"skill", "skills", "gap", "gaps", "improve", "improving"})),
+)
+
+MAX_SUGGESTIONS = 3
+
+# Suggestions returned with every template chat response
+_TEMPLATE_SUGGESTIONS = tuple(map(sys.intern, ("Generate roadmap", "Find resources", "Analyze skills")))
+
+# Template chat responses in priority order (used when OpenAI is unavailable)
+TEMPLATE_CHAT_RESPONSES = (
+    (frozenset({"hello", "hi", "hey"}), "Hello! I'm your AI Career Coach. I can help you with career guidance, learning roadmaps, and skill development. How can I assist you today?"),
+    (_ROADMAP_WORDS, "I can help you create a personalized learning roadmap! Please tell me:\n1. What role are you targeting?\n2. What skills do you currently have?\n3. What's your timeline?"),
+    (frozenset({"frontend", "react", "web developer"}), "Great! Frontend development is an exciting field. A typical path includes:\n\n1. **Foundations** (2-3 months):\n   - HTML, CSS, JavaScript\n   - Git & GitHub\n\n2. **Framework** (2-3 months):\n   - React or Vue.js\n   - State management\n   - API integration\n\n3. **Advanced** (2-3 months):\n   - TypeScript\n   - Testing (Jest, React Testing Library)\n   - Performance optimization\n\nWould you like specific resources for any of these areas?"),
+    (frozenset({"backend", "api", "apis", "server", "servers"}), "Backend development roadmap:\n\n1. **Core Skills**:\n   - Programming language (Python, Node.js, Java)\n   - Databases (SQL + NoSQL)\n   - REST APIs\n\n2. **Advanced**:\n   - Authentication & Authorization\n   - Caching strategies\n   - Microservices\n\n3. **DevOps**:\n   - Docker\n   - CI/CD\n   - Cloud platforms (AWS/Azure)\n\nWhat's your preferred programming language?"),
+)
+
+
+# Single automaton over every template keyword; each keyword maps to the
+# priority index of its response
+_TEMPLATE_MATCHER = KeywordMatcher(
+    (keyword, index)
+    for index, (keywords, _) in enumerate(TEMPLATE_CHAT_RESPONSES)
+    for keyword in keywords
+)
+
+
+def _tokenize(message: str) -> FrozenSet[str]:
+    """Lowercased words of a message plus adjacent word pairs (for phrases)"""
+    words = _WORD_RE.findall(message.lower())
+    return frozenset(words).union(f"{first} {second}" for first, second in zip(words, words[1:]))
+
+
+# Hashable view of the profile fields that shape the chat context
+ProfileKey = Tuple[Tuple[str, ...], Any, Any]
+
+SYSTEM_MESSAGE_CACHE_SIZE = 512
+
+
+def _profile_key(user_profile: Optional[Dict[str, Any]]) -> Optional[ProfileKey]:
+    """Reduce a user profile to the fields used in the chat context"""
+    if not user_profile:
+        return None
+    
+    skills = user_profile.get("skills") or []
+    return (tuple(skills[:15]), user_profile.get("targetRole"), user_profile.get("experience"))
+
+
+@functools.lru_cache(maxsize=SYSTEM_MESSAGE_CACHE_SIZE)
+def _build_chat_context(profile_key: Optional[ProfileKey]) -> str:
+    """Build context string from user profile"""
+    if profile_key is None:
+        return "No user profile available yet."
+    
+    skills, target_role, experience = profile_key
+    context_parts = []
+    
+    if skills:
+        skills_str = ", ".join(skills)
+        context_parts.append(f"User's current skills: {skills_str}")
+    
+    if target_role:
+        context_parts.append(f"Target role: {target_role}")
+    
+    if experience:
+        context_parts.append(f"Experience level: {experience}")
+    
+    context = "\\n".join(context_parts) if context_parts else "No profile information available."
+    # Interned so equal contexts share one string even after cache eviction
+    return sys.intern(context)
+
+
+@functools.cache
+def _load_openai():
+    """
+    Import the OpenAI SDK on first use
+    
+    Deferred so template mode doesn't pay for importing openai (and httpx,
+    pydantic models, jiter) at startup. Returns None if it is not installed.
+    """
+    try:
+        return importlib.import_module("openai")
+    except ImportError:
+        logger.warning("OpenAI not available for career advisor")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Load the tiktoken encoding for the chat model, or None if unavailable"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+def _count_tokens(text: str) -> int:
+    """Count tokens in text, estimating ~4 characters per token without tiktoken"""
+    encoding = _get_token_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+def _select_history_window(history: List[Dict[str, str]], token_budget: int) -> List[Dict[str, str]]:
+    """
+    Return the most recent messages that fit within a token budget
+    
+    The latest message is always kept, even if it alone exceeds the budget.
+    """
+    window = []
+    used = 0
+    
+    for msg in reversed(history):
+        # Add ~4 tokens per message for role and separators
+        used += _count_tokens(msg["content"]) + 4
+        if used > token_budget and window:
+            break
+        window.append({"role": msg["role"], "content": msg["content"]})
+    
+    window.reverse()
+    return window
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a failed OpenAI call
+    
+    Uses full jitter so clients that failed together don't retry together,
+    but never less than the server's Retry-After hint on rate limit errors.
+    """
+    delay = random.uniform(0, min(2 ** attempt, MAX_RETRY_DELAY))
+    
+    if isinstance(error, _load_openai().RateLimitError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            delay = max(delay, min(float(retry_after), MAX_RETRY_DELAY))
+        except (TypeError, ValueError):
+            pass
+    
+    return delay
+
+
+def _build_async_http_client(openai):
+    """
+    Build the HTTP client used by AsyncOpenAI.
+
+    Prefers the aiohttp-backed client (installed via ``openai[aiohttp]``), which
+    does not serialize in-flight requests the way httpx's async pool does under
+    heavy concurrency. Falls back to httpx with a larger connection pool.
+    """
+    import httpx  # Installed with openai
+    
+    limits = httpx.Limits(**OPENAI_CONNECTION_LIMITS)
+    aiohttp_client_cls = getattr(openai, "DefaultAioHttpClient", None)
+    if aiohttp_client_cls is not None:
+        try:
+            return aiohttp_client_cls(limits=limits)
+        except RuntimeError:
+            # Raised when the aiohttp extra is not installed
+            logger.info("aiohttp transport unavailable, using httpx")
+    return openai.DefaultAsyncHttpxClient(limits=limits)
+
+
+@functools.cache
+def _get_client():
+    """
+    Return the process-wide AsyncOpenAI client, creating it on first use
+    
+    All CareerAdvisor instances share this client and its connection pool,
+    so connections to the API stay warm instead of being set up per advisor.
+    """
+    openai = _load_openai()
+    return openai.AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=_build_async_http_client(openai)
+    )
+
+
+async def close_openai_client():
+    """Close the shared OpenAI client's connections (call on application shutdown)"""
+    if _get_client.cache_info().currsize:
+        await _get_client().close()
+        _get_client.cache_clear()
+
 class CareerAdvisor:
-    """AI-powered career guidance and roadmap generation"""
+    """
+    AI-powered career guidance and roadmap generation
+    
+    Cheap and safe to construct repeatedly: the OpenAI client is shared
+    across instances (see _get_client).
+    """
     
     def __init__(self):
         """Initialize the career advisor"""
         self.openai_client = None
+        self._openai_mod = None
+        self.cache = create_llm_cache()
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._system_msg_cache: Dict[Optional[ProfileKey], Dict[str, str]] = {}
+        # session_id -> (number of leading messages covered, summary text)
+        self._history_summary: Dict[str, Tuple[int, str]] = {}
+        self._summary_tasks: Dict[str, "asyncio.Task[None]"] = {}
         self.use_openai = os.getenv("USE_OPENAI", "false").lower() == "true"
         
-        if self.use_openai and OPENAI_AVAILABLE:
+        if self.use_openai:
             self._initialize_openai()
         else:
             logger.info("Career advisor running in template mode (OpenAI disabled)")
@@ -43,8 +371,13 @@ class CareerAdvisor:
                 logger.error("OPENAI_API_KEY not found in environment")
                 return
             
-            # Initialize OpenAI client (compatible with openai>=1.0.0)
-            self.openai_client = openai.OpenAI(api_key=api_key)
+            openai = _load_openai()
+            if openai is None:
+                return
+            self._openai_mod = openai
+            
+            # Shared OpenAI client (compatible with openai>=1.0.0)
+            self.openai_client = _get_client()
             logger.info("✅ Career Advisor: OpenAI client initialized")
         except Exception as e:
             logger.error(f"❌ Failed to initialize OpenAI for career advisor: {e}")
@@ -54,7 +387,8 @@ class CareerAdvisor:
         self,
         message: str,
         history: List[Dict[str, str]],
-        user_profile: Optional[Dict[str, Any]] = None
+        user_profile: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate a conversational response to user's message
@@ -63,122 +397,276 @@ class CareerAdvisor:
             message: User's message
             history: Conversation history
             user_profile: User's profile including skills, goals, etc.
+            session_id: Chat session ID, used to keep a summary of older turns
         
         Returns:
             Response with message, data, and suggestions
         """
         if self.openai_client:
-            return await self._generate_ai_chat_response(message, history, user_profile)
+            return await self._generate_ai_chat_response(message, history, user_profile, session_id)
         else:
             return self._generate_template_chat_response(message, user_profile)
     
-    async def _generate_ai_chat_response(
+    async def generate_chat_response_stream(
         self,
         message: str,
         history: List[Dict[str, str]],
+        user_profile: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a conversational response as text chunks
+        
+        Args:
+            message: User's message
+            history: Conversation history
+            user_profile: User's profile including skills, goals, etc.
+            session_id: Chat session ID, used to keep a summary of older turns
+        
+        Yields:
+            Pieces of the response text as they arrive from OpenAI
+        """
+        if not self.openai_client:
+            yield self._generate_template_chat_response(message, user_profile)["message"]
+            return
+        
+        try:
+            params = self._completion_params(
+                self._build_chat_messages(history, user_profile, session_id),
+                prompt_cache_key=CHAT_PROMPT_CACHE_KEY
+            )
+            stream = await self._create_completion({**params, "stream": True})
+        except Exception as e:
+            logger.error(f"❌ Error starting AI chat stream: {e}")
+            yield self._generate_template_chat_response(message, user_profile)["message"]
+            return
+        
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+    
+    def finalize_chat_response(
+        self,
+        message: str,
+        ai_message: str,
         user_profile: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Attach structured data and suggestions to a complete AI reply"""
+        return {
+            "message": ai_message,
+            "data": self._extract_structured_data(ai_message),
+            "suggestions": self._generate_suggestions(message, user_profile)
+        }
+    
+    def _build_chat_messages(
+        self,
+        history: List[Dict[str, str]],
+        user_profile: Optional[Dict[str, Any]],
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Build the message list sent to OpenAI for a chat turn"""
+        # The static prompt comes first so the provider can reuse its cached
+        # prefix, followed by the profile context
+        messages = [CHAT_SYSTEM_MESSAGE, self._get_context_message(user_profile)]
+        
+        # Add as much recent conversation history as fits the token budget
+        window = _select_history_window(history, CHAT_HISTORY_TOKEN_BUDGET)
+        
+        if session_id:
+            summary_message = self._get_history_summary_message(
+                session_id, history, len(history) - len(window)
+            )
+            if summary_message:
+                messages.append(summary_message)
+        
+        messages.extend(window)
+        return messages
+    
+    def _get_history_summary_message(
+        self,
+        session_id: str,
+        history: List[Dict[str, str]],
+        older_count: int
+    ) -> Optional[Dict[str, str]]:
+        """
+        Return the rolling summary of turns that fell out of the history window
+        
+        When the session is long enough and new turns have fallen out of the
+        window, the summary is refreshed in the background; this turn uses the
+        summary as it stands.
+        """
+        if older_count <= 0:
+            return None
+        
+        covered, summary = self._history_summary.get(session_id, (0, ""))
+        
+        if (
+            len(history) > HISTORY_SUMMARY_THRESHOLD
+            and older_count > covered
+            and session_id not in self._summary_tasks
+        ):
+            task = asyncio.ensure_future(self._refresh_history_summary(
+                session_id, summary, history[covered:older_count], older_count
+            ))
+            self._summary_tasks[session_id] = task
+            task.add_done_callback(lambda _: self._summary_tasks.pop(session_id, None))
+        
+        if not summary:
+            return None
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+    
+    async def _refresh_history_summary(
+        self,
+        session_id: str,
+        previous_summary: str,
+        new_messages: List[Dict[str, str]],
+        covered: int
+    ):
+        """Fold newly dropped turns into a session's rolling summary"""
+        transcript = "\n".join(f"{msg['role']}: {msg['content'][:1000]}" for msg in new_messages)
+        if previous_summary:
+            transcript = f"Previous summary:\n{previous_summary}\n\nNew messages:\n{transcript}"
+        
+        try:
+            # Single attempt: a stale summary is fine, so don't spend rate limit retrying
+            response = await self._create_completion({
+                "model": "gpt-4o-mini",
+                "messages": [
+                    {"role": "system", "content": HISTORY_SUMMARY_PROMPT},
+                    {"role": "user", "content": transcript}
+                ],
+                "temperature": 0.3,
+                "max_tokens": 300
+            }, max_retries=1)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to summarize chat history: {e}")
+            return
+        
+        # Evict the oldest session once the store is full
+        if session_id not in self._history_summary and len(self._history_summary) >= HISTORY_SUMMARY_CACHE_SIZE:
+            self._history_summary.pop(next(iter(self._history_summary)))
+        self._history_summary[session_id] = (covered, response.choices[0].message.content.strip())
+    
+    async def _generate_ai_chat_response(
+        self,
+        message: str,
+        history: List[Dict[str, str]],
+        user_profile: Optional[Dict[str, Any]],
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate AI-powered chat response using OpenAI"""
         try:
-            # Build context
-            context = self._build_chat_context(user_profile)
-            
-            # Build conversation messages
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"""You are an expert AI Career Coach and Mentor. Your role is to:
-1. Analyze users' current skills and career goals
-2. Provide personalized career advice and roadmaps
-3. Suggest learning resources, certifications, and projects
-4. Help users understand skill gaps and how to bridge them
-5. Be encouraging, specific, and actionable
-
-{context}
-
-Always provide:
-- Clear, actionable advice
-- Specific learning resources (courses, books, tutorials)
-- Project ideas to build skills
-- Timeline estimates for skill development
-- Industry insights and trends
-
-Be conversational, empathetic, and motivating."""
-                }
-            ]
-            
-            # Add conversation history (last 10 messages for context)
-            for msg in history[-10:]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-            
             # Call OpenAI API with retry logic
-            response = await self._call_openai_with_retry(messages)
+            response = await self._call_openai_with_retry(
+                self._build_chat_messages(history, user_profile, session_id),
+                prompt_cache_key=CHAT_PROMPT_CACHE_KEY
+            )
             
-            # Parse response
+            # Parse response, then extract structured data and suggestions
             ai_message = response.choices[0].message.content
-            
-            # Extract structured data if present
-            structured_data = self._extract_structured_data(ai_message)
-            
-            # Generate suggestions
-            suggestions = self._generate_suggestions(message, user_profile)
-            
-            return {
-                "message": ai_message,
-                "data": structured_data,
-                "suggestions": suggestions
-            }
+            return self.finalize_chat_response(message, ai_message, user_profile)
         
         except Exception as e:
             logger.error(f"❌ Error generating AI chat response: {e}")
             return self._generate_template_chat_response(message, user_profile)
     
+    def _completion_params(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Optional[Dict[str, Any]] = None,
+        prompt_cache_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the chat completion request body shared by live and batch calls"""
+        params = {
+            "model": "gpt-4o-mini",
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": 1500
+        }
+        if response_format:
+            params["response_format"] = response_format
+        if prompt_cache_key:
+            # Sent via extra_body so older SDK versions accept it
+            params["extra_body"] = {"prompt_cache_key": prompt_cache_key}
+        return params
+    
     async def _call_openai_with_retry(
         self,
         messages: List[Dict[str, str]],
-        max_retries: int = 3
+        max_retries: int = 3,
+        response_format: Optional[Dict[str, Any]] = None,
+        prompt_cache_key: Optional[str] = None
     ) -> Any:
-        """Call OpenAI API with exponential backoff retry"""
-        import time
+        """
+        Call OpenAI API with exponential backoff retry, serving repeats from cache.
+        Identical requests already in flight share one upstream call instead of
+        each spending a request against the rate limit.
+        """
+        params = self._completion_params(messages, response_format, prompt_cache_key)
+        
+        cache_key = make_cache_key(params)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return self._openai_mod.types.chat.ChatCompletion.model_validate(cached)
+        
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_completion(params, cache_key, max_retries))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # Shield so one caller disconnecting does not cancel the shared request
+        return await asyncio.shield(task)
+    
+    async def _fetch_completion(
+        self,
+        params: Dict[str, Any],
+        cache_key: str,
+        max_retries: int
+    ) -> Any:
+        """Request a completion and store it in the cache"""
+        response = await self._create_completion(params, max_retries)
+        await self.cache.set(cache_key, response.model_dump(mode="json"), ttl=LLM_CACHE_TTL)
+        return response
+    
+    async def _create_completion(self, params: Dict[str, Any], max_retries: int = 3) -> Any:
+        """Call the Chat Completions API, retrying transient errors with jittered backoff"""
+        # Timeouts, dropped connections, 5xx responses and rate limits are transient;
+        # anything else (bad request, auth) fails immediately
+        openai = self._openai_mod
+        retryable = (
+            openai.APIConnectionError,
+            openai.APITimeoutError,
+            openai.InternalServerError,
+            openai.RateLimitError
+        )
         
         for attempt in range(max_retries):
             try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1500
-                )
-                return response
-            except Exception as e:
-                if "rate_limit" in str(e).lower() and attempt < max_retries - 1:
-                    wait_time = (2 ** attempt)  # 1s, 2s, 4s
-                    logger.warning(f"⏳ Rate limit hit, retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
+                return await self.openai_client.chat.completions.create(**params)
+            except retryable as e:
+                if attempt == max_retries - 1:
+                    logger.error(f"❌ OpenAI call failed after {max_retries} attempts: {e}")
                     raise
+                
+                wait_time = _retry_delay(e, attempt)
+                logger.warning(f"⏳ {type(e).__name__}, retrying in {wait_time:.1f}s...")
+                await asyncio.sleep(wait_time)
     
-    def _build_chat_context(self, user_profile: Optional[Dict[str, Any]]) -> str:
-        """Build context string from user profile"""
-        if not user_profile:
-            return "No user profile available yet."
+    def _get_context_message(self, user_profile: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Return the profile context message, building it once per distinct profile"""
+        profile_key = _profile_key(user_profile)
+        context_message = self._system_msg_cache.get(profile_key)
+        if context_message is not None:
+            return context_message
         
-        context_parts = []
+        context_message = {"role": "system", "content": _build_chat_context(profile_key)}
         
-        if user_profile.get("skills"):
-            skills_str = ", ".join(user_profile["skills"][:15])
-            context_parts.append(f"User's current skills: {skills_str}")
-        
-        if user_profile.get("targetRole"):
-            context_parts.append(f"Target role: {user_profile['targetRole']}")
-        
-        if user_profile.get("experience"):
-            context_parts.append(f"Experience level: {user_profile['experience']}")
-        
-        return "\\n".join(context_parts) if context_parts else "No profile information available."
+        # Evict the oldest entry once the cache is full
+        if len(self._system_msg_cache) >= SYSTEM_MESSAGE_CACHE_SIZE:
+            self._system_msg_cache.pop(next(iter(self._system_msg_cache)))
+        self._system_msg_cache[profile_key] = context_message
+        return context_message
     
     def _extract_structured_data(self, message: str) -> Optional[Dict[str, Any]]:
         """Extract structured data from AI response (e.g., resources, timeline)"""
@@ -201,23 +689,13 @@ Be conversational, empathetic, and motivating."""
         user_profile: Optional[Dict[str, Any]]
     ) -> List[str]:
         """Generate quick action suggestions"""
-        suggestions = []
-        
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["roadmap", "path", "plan"]):
-            suggestions.append("Generate detailed roadmap")
-        
-        if any(word in message_lower for word in ["learn", "study", "course"]):
-            suggestions.append("Find learning resources")
-        
-        if any(word in message_lower for word in ["project", "build", "practice"]):
-            suggestions.append("Get project ideas")
-        
-        if any(word in message_lower for word in ["skill", "gap", "improve"]):
-            suggestions.append("Analyze skill gaps")
+        words = _tokenize(message)
         
-        return suggestions[:3]  # Limit to 3 suggestions
+        # Stop scanning rules once the limit is reached
+        return list(itertools.islice(
+            (label for label, keywords in _SUGGEST_RULES if words & keywords),
+            MAX_SUGGESTIONS
+        ))
     
     def _generate_template_chat_response(
         self,
@@ -225,28 +703,18 @@ Be conversational, empathetic, and motivating."""
         user_profile: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Generate template-based response when OpenAI is unavailable"""
-        message_lower = message.lower()
-        
-        # Simple keyword-based responses
-        if any(word in message_lower for word in ["hello", "hi", "hey"]):
-            response = "Hello! I'm your AI Career Coach. I can help you with career guidance, learning roadmaps, and skill development. How can I assist you today?"
-        
-        elif any(word in message_lower for word in ["roadmap", "path", "plan"]):
-            response = "I can help you create a personalized learning roadmap! Please tell me:\n1. What role are you targeting?\n2. What skills do you currently have?\n3. What's your timeline?"
-        
-        elif any(word in message_lower for word in ["frontend", "react", "web developer"]):
-            response = "Great! Frontend development is an exciting field. A typical path includes:\n\n1. **Foundations** (2-3 months):\n   - HTML, CSS, JavaScript\n   - Git & GitHub\n\n2. **Framework** (2-3 months):\n   - React or Vue.js\n   - State management\n   - API integration\n\n3. **Advanced** (2-3 months):\n   - TypeScript\n   - Testing (Jest, React Testing Library)\n   - Performance optimization\n\nWould you like specific resources for any of these areas?"
-        
-        elif any(word in message_lower for word in ["backend", "api", "server"]):
-            response = "Backend development roadmap:\n\n1. **Core Skills**:\n   - Programming language (Python, Node.js, Java)\n   - Databases (SQL + NoSQL)\n   - REST APIs\n\n2. **Advanced**:\n   - Authentication & Authorization\n   - Caching strategies\n   - Microservices\n\n3. **DevOps**:\n   - Docker\n   - CI/CD\n   - Cloud platforms (AWS/Azure)\n\nWhat's your preferred programming language?"
+        # Simple keyword-based responses, highest priority match wins
+        hits = _TEMPLATE_MATCHER.find_values(message.lower())
         
+        if hits:
+            response = TEMPLATE_CHAT_RESPONSES[min(hits)][1]
         else:
             response = f"I understand you're interested in: '{message}'. I can help with:\n\n• Creating personalized learning roadmaps\n• Identifying skill gaps\n• Recommending courses and resources\n• Suggesting hands-on projects\n\nWhat would you like to explore first?"
         
         return {
             "message": response,
             "data": None,
-            "suggestions": ["Generate roadmap", "Find resources", "Analyze skills"]
+            "suggestions": _TEMPLATE_SUGGESTIONS
         }
     
     async def generate_career_roadmap(
@@ -278,69 +746,175 @@ Be conversational, empathetic, and motivating."""
         timeline: str
     ) -> Dict[str, Any]:
         """Generate AI-powered career roadmap"""
+        cache_key = self._roadmap_cache_key(target_role, current_skills, timeline)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            skills_str = ", ".join(current_skills) if current_skills else "beginner level"
+            response = await self._call_openai_with_retry(
+                self._build_roadmap_messages(target_role, current_skills, timeline),
+                response_format=ROADMAP_RESPONSE_FORMAT
+            )
+            
+            # Parse JSON response
+            roadmap = self._parse_roadmap_content(response.choices[0].message.content)
+            await self.cache.set(cache_key, roadmap, ttl=ROADMAP_CACHE_TTL)
             
-            prompt = f"""Create a detailed, actionable career roadmap for someone who wants to become a {target_role}.
+            logger.info(f"✅ Generated AI roadmap for {target_role}")
+            return roadmap
+        
+        except Exception as e:
+            logger.error(f"❌ Error generating AI roadmap: {e}")
+            return self._generate_template_roadmap(target_role, current_skills, timeline)
+    
+    def _roadmap_cache_key(
+        self,
+        target_role: str,
+        current_skills: List[str],
+        timeline: str
+    ) -> str:
+        """Cache key for a generated roadmap (skill order does not matter)"""
+        return make_cache_key({
+            "kind": "roadmap",
+            "target_role": target_role,
+            "current_skills": sorted(current_skills),
+            "timeline": timeline
+        })
+    
+    def _build_roadmap_messages(
+        self,
+        target_role: str,
+        current_skills: List[str],
+        timeline: str
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages requesting a roadmap"""
+        skills_str = ", ".join(current_skills) if current_skills else "beginner level"
+        
+        prompt = f"""Create a detailed, actionable career roadmap for someone who wants to become a {target_role}.
 
 Current skills: {skills_str}
 Timeline: {timeline}
 
-Provide a comprehensive roadmap in the following JSON format:
-
-{{
-  "role": "{target_role}",
-  "timeline": "{timeline}",
-  "overview": "Brief overview of the role and career path",
-  "skill_gaps": ["list", "of", "skills", "to", "learn"],
-  "phases": [
-    {{
-      "phase": "Phase 1: Foundations",
-      "duration": "2 months",
-      "skills": ["skill1", "skill2"],
-      "resources": [
-        {{"title": "Resource name", "type": "course/book/tutorial", "url": "link", "duration": "time"}},
-      ],
-      "projects": ["project idea 1", "project idea 2"],
-      "milestones": ["milestone 1", "milestone 2"]
-    }}
-  ],
-  "certifications": ["certification 1", "certification 2"],
-  "job_search_tips": ["tip 1", "tip 2"],
-  "salary_range": "Expected salary range",
-  "industry_trends": ["trend 1", "trend 2"]
-}}
+Break the roadmap into phases that fit the timeline. For each phase, list the skills to learn, resources (title, type such as course/book/tutorial, URL, and duration), project ideas, and milestones. Also cover skill gaps, certifications, job search tips, the expected salary range, and industry trends.
 
 Be specific, actionable, and realistic. Include actual course names, book titles, and project ideas."""
 
-            response = await self._call_openai_with_retry([
-                {
-                    "role": "system",
-                    "content": "You are an expert career advisor. Generate detailed, structured career roadmaps in JSON format."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ])
-            
-            # Parse JSON response
-            content = response.choices[0].message.content
-            
-            # Extract JSON from markdown code blocks if present
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            roadmap = json.loads(content)
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert career advisor. Generate detailed, structured career roadmaps in JSON format."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _parse_roadmap_content(self, content: str) -> Dict[str, Any]:
+        """Parse the roadmap JSON out of a model response"""
+        return extract_json(content)
+    
+    async def submit_roadmap_batch(self, jobs: List[Dict[str, Any]]) -> str:
+        """
+        Submit roadmap requests to the OpenAI Batch API
+        
+        Batch jobs complete within 24 hours at half the per-token cost, which
+        suits precomputing roadmaps for common roles. Each request's custom_id is
+        the roadmap's cache key, so any process (e.g. after a restart) can store
+        the results.
+        
+        Args:
+            jobs: List of dicts with target_role, current_skills, and timeline
+        
+        Returns:
+            Batch ID to pass to poll_batch
+        """
+        if not self.openai_client:
+            raise RuntimeError("OpenAI client not available for batch roadmap generation")
+        
+        lines = []
+        cache_keys = set()
+        for job in jobs:
+            target_role = job["target_role"]
+            current_skills = job.get("current_skills", [])
+            timeline = job.get("timeline", "6 months")
             
-            logger.info(f"✅ Generated AI roadmap for {target_role}")
-            return roadmap
+            cache_key = self._roadmap_cache_key(target_role, current_skills, timeline)
+            # custom_ids must be unique within a batch, and identical jobs share a roadmap anyway
+            if cache_key in cache_keys:
+                continue
+            cache_keys.add(cache_key)
+            lines.append(json.dumps({
+                "custom_id": cache_key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._completion_params(
+                    self._build_roadmap_messages(target_role, current_skills, timeline),
+                    ROADMAP_RESPONSE_FORMAT
+                )
+            }))
         
-        except Exception as e:
-            logger.error(f"❌ Error generating AI roadmap: {e}")
-            return self._generate_template_roadmap(target_role, current_skills, timeline)
+        batch_file = await self.openai_client.files.create(
+            file=("roadmaps.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"kind": ROADMAP_BATCH_KIND}
+        )
+        
+        logger.info(f"📦 Submitted roadmap batch {batch.id} with {len(lines)} jobs")
+        return batch.id
+    
+    async def poll_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Check a roadmap batch and store finished roadmaps in the cache
+        
+        Args:
+            batch_id: ID returned by submit_roadmap_batch
+        
+        Returns:
+            Batch status and the number of roadmaps stored
+        """
+        if not self.openai_client:
+            raise RuntimeError("OpenAI client not available for batch roadmap generation")
+        
+        batch = await self.openai_client.batches.retrieve(batch_id)
+        result = {"id": batch.id, "status": batch.status, "stored": 0}
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            return result
+        
+        if (batch.metadata or {}).get("kind") != ROADMAP_BATCH_KIND:
+            logger.warning(f"Batch {batch_id} was not submitted by submit_roadmap_batch")
+            return result
+        
+        async with self.openai_client.files.with_streaming_response.content(batch.output_file_id) as response:
+            async for line in response.iter_lines():
+                if not line.strip():
+                    continue
+                
+                record = json.loads(line)
+                cache_key = record.get("custom_id")
+                output = record.get("response") or {}
+                if cache_key is None or record.get("error") or output.get("status_code") != 200:
+                    continue
+                
+                try:
+                    content = output["body"]["choices"][0]["message"]["content"]
+                    roadmap = self._parse_roadmap_content(content)
+                except (KeyError, IndexError, ValueError) as e:
+                    logger.warning(f"Skipping unparsable batch result {record.get('custom_id')}: {e}")
+                    continue
+                
+                await self.cache.set(cache_key, roadmap, ttl=ROADMAP_CACHE_TTL)
+                result["stored"] += 1
+        
+        logger.info(f"✅ Stored {result['stored']} roadmaps from batch {batch_id}")
+        return result
     
     def _generate_template_roadmap(
         self,
@@ -353,16 +927,15 @@ Be specific, actionable, and realistic. Include actual course names, book titles
         templates = self._load_roadmap_templates()
         
         role_lower = target_role.lower()
-        template_key = None
         
-        # Match role to template
-        for key in templates.keys():
-            if key in role_lower or role_lower in key:
-                template_key = key
-                break
+        # Match role to template: a template key inside the role, else a role
+        # that is part of a template key (e.g. "front")
+        match = _TEMPLATE_RE.search(role_lower)
+        template_key = match.group(0) if match else _TEMPLATE_FRAGMENTS.get(role_lower)
         
         if template_key:
-            return templates[template_key]
+            # Callers get their own copy; the nested phases and lists are shared otherwise
+            return copy.deepcopy(templates[template_key])
         
         # Default generic roadmap
         return {
@@ -397,131 +970,145 @@ Be specific, actionable, and realistic. Include actual course names, book titles
             "industry_trends": ["Stay updated with industry blogs", "Follow thought leaders"]
         }
     
-    def _load_roadmap_templates(self) -> Dict[str, Dict[str, Any]]:
-        """Load predefined roadmap templates for common roles"""
-        return {
-            "frontend": {
-                "role": "Frontend Developer",
-                "timeline": "6 months",
-                "overview": "Frontend developers build user interfaces and client-side applications using HTML, CSS, JavaScript, and modern frameworks.",
-                "skill_gaps": ["React/Vue", "TypeScript", "State Management", "Testing", "Performance Optimization"],
-                "phases": [
-                    {
-                        "phase": "Phase 1: Foundations",
-                        "duration": "2 months",
-                        "skills": ["HTML5", "CSS3", "JavaScript ES6+", "Git"],
-                        "resources": [
-                            {"title": "freeCodeCamp Responsive Web Design", "type": "course", "url": "https://www.freecodecamp.org", "duration": "300 hours"},
-                            {"title": "JavaScript.info", "type": "tutorial", "url": "https://javascript.info", "duration": "self-paced"},
-                            {"title": "Eloquent JavaScript", "type": "book", "url": "https://eloquentjavascript.net", "duration": "4 weeks"}
-                        ],
-                        "projects": ["Personal portfolio website", "To-do list app", "Calculator"],
-                        "milestones": ["Master DOM manipulation", "Build 3 vanilla JS projects", "Learn Git workflow"]
-                    },
-                    {
-                        "phase": "Phase 2: Modern Framework",
-                        "duration": "2 months",
-                        "skills": ["React", "Component architecture", "Hooks", "API integration"],
-                        "resources": [
-                            {"title": "React Official Tutorial", "type": "tutorial", "url": "https://react.dev", "duration": "2 weeks"},
-                            {"title": "The Complete React Developer Course", "type": "course", "url": "https://www.udemy.com", "duration": "40 hours"},
-                            {"title": "Kent C. Dodds Epic React", "type": "course", "url": "https://epicreact.dev", "duration": "8 weeks"}
-                        ],
-                        "projects": ["Weather app with API", "E-commerce product page", "Blog with routing"],
-                        "milestones": ["Build 3 React apps", "Integrate REST APIs", "Deploy to Vercel"]
-                    },
-                    {
-                        "phase": "Phase 3: Advanced & Professional",
-                        "duration": "2 months",
-                        "skills": ["TypeScript", "State management (Redux/Zustand)", "Testing", "Performance"],
-                        "resources": [
-                            {"title": "TypeScript Handbook", "type": "docs", "url": "https://www.typescriptlang.org", "duration": "2 weeks"},
-                            {"title": "Testing JavaScript", "type": "course", "url": "https://testingjavascript.com", "duration": "4 weeks"},
-                            {"title": "Web Performance Fundamentals", "type": "course", "url": "https://frontendmasters.com", "duration": "3 hours"}
-                        ],
-                        "projects": ["Full-stack CRUD app", "Real-time chat app", "Portfolio with CMS"],
-                        "milestones": ["Convert project to TypeScript", "Achieve 90+ Lighthouse score", "Write unit tests"]
-                    }
-                ],
-                "certifications": [
-                    "Meta Front-End Developer Professional Certificate",
-                    "Microsoft Certified: Azure Developer Associate (optional)"
+    def _load_roadmap_templates(self) -> Mapping[str, Dict[str, Any]]:
+        """Return predefined roadmap templates for common roles"""
+        return _ROADMAP_TEMPLATES
+
+# Predefined roadmap templates for common roles (built once at import, read-only)
+_ROADMAP_TEMPLATES: Final[Mapping[str, Dict[str, Any]]] = MappingProxyType({
+    "frontend": {
+        "role": "Frontend Developer",
+        "timeline": "6 months",
+        "overview": "Frontend developers build user interfaces and client-side applications using HTML, CSS, JavaScript, and modern frameworks.",
+        "skill_gaps": ["React/Vue", "TypeScript", "State Management", "Testing", "Performance Optimization"],
+        "phases": [
+            {
+                "phase": "Phase 1: Foundations",
+                "duration": "2 months",
+                "skills": ["HTML5", "CSS3", "JavaScript ES6+", "Git"],
+                "resources": [
+                    {"title": "freeCodeCamp Responsive Web Design", "type": "course", "url": "https://www.freecodecamp.org", "duration": "300 hours"},
+                    {"title": "JavaScript.info", "type": "tutorial", "url": "https://javascript.info", "duration": "self-paced"},
+                    {"title": "Eloquent JavaScript", "type": "book", "url": "https://eloquentjavascript.net", "duration": "4 weeks"}
                 ],
-                "job_search_tips": [
-                    "Build 5+ projects showcasing different skills",
-                    "Contribute to open source React projects",
-                    "Write technical blog posts",
-                    "Network on Twitter and LinkedIn",
-                    "Practice LeetCode easy/medium problems"
+                "projects": ["Personal portfolio website", "To-do list app", "Calculator"],
+                "milestones": ["Master DOM manipulation", "Build 3 vanilla JS projects", "Learn Git workflow"]
+            },
+            {
+                "phase": "Phase 2: Modern Framework",
+                "duration": "2 months",
+                "skills": ["React", "Component architecture", "Hooks", "API integration"],
+                "resources": [
+                    {"title": "React Official Tutorial", "type": "tutorial", "url": "https://react.dev", "duration": "2 weeks"},
+                    {"title": "The Complete React Developer Course", "type": "course", "url": "https://www.udemy.com", "duration": "40 hours"},
+                    {"title": "Kent C. Dodds Epic React", "type": "course", "url": "https://epicreact.dev", "duration": "8 weeks"}
                 ],
-                "salary_range": "$60k-$120k (varies by location and experience)",
-                "industry_trends": [
-                    "Server components and Next.js 14+",
-                    "AI-assisted development",
-                    "Web3 and blockchain frontends",
-                    "Micro-frontends architecture"
-                ]
+                "projects": ["Weather app with API", "E-commerce product page", "Blog with routing"],
+                "milestones": ["Build 3 React apps", "Integrate REST APIs", "Deploy to Vercel"]
             },
-            "backend": {
-                "role": "Backend Developer",
-                "timeline": "6 months",
-                "overview": "Backend developers build server-side logic, APIs, and database systems that power applications.",
-                "skill_gaps": ["API design", "Database optimization", "Authentication", "Caching", "DevOps basics"],
-                "phases": [
-                    {
-                        "phase": "Phase 1: Programming & Databases",
-                        "duration": "2 months",
-                        "skills": ["Python/Node.js", "SQL", "REST APIs", "Git"],
-                        "resources": [
-                            {"title": "Python for Everybody", "type": "course", "url": "https://www.py4e.com", "duration": "8 weeks"},
-                            {"title": "SQL Tutorial - W3Schools", "type": "tutorial", "url": "https://www.w3schools.com/sql", "duration": "2 weeks"},
-                            {"title": "FastAPI/Django/Express Tutorial", "type": "tutorial", "url": "official docs", "duration": "4 weeks"}
-                        ],
-                        "projects": ["Simple CRUD API", "Blog API", "User authentication system"],
-                        "milestones": ["Build 3 REST APIs", "Master SQL queries", "Deploy to Heroku/Render"]
-                    },
-                    {
-                        "phase": "Phase 2: Advanced Backend",
-                        "duration": "2 months",
-                        "skills": ["Database design", "Caching (Redis)", "Message queues", "Security"],
-                        "resources": [
-                            {"title": "System Design Primer", "type": "github", "url": "https://github.com/donnemartin/system-design-primer", "duration": "ongoing"},
-                            {"title": "Designing Data-Intensive Applications", "type": "book", "url": "amazon", "duration": "8 weeks"}
-                        ],
-                        "projects": ["E-commerce backend", "Real-time notification service", "File upload system"],
-                        "milestones": ["Implement caching", "Add JWT auth", "Handle 1000+ requests/sec"]
-                    },
-                    {
-                        "phase": "Phase 3: DevOps & Scale",
-                        "duration": "2 months",
-                        "skills": ["Docker", "CI/CD", "AWS/Azure", "Monitoring"],
-                        "resources": [
-                            {"title": "Docker Mastery", "type": "course", "url": "udemy", "duration": "20 hours"},
-                            {"title": "AWS Certified Developer", "type": "certification", "url": "aws.amazon.com", "duration": "6 weeks"}
-                        ],
-                        "projects": ["Dockerize apps", "Set up CI/CD pipeline", "Deploy to AWS"],
-                        "milestones": ["Containerize all projects", "Automate deployments", "Monitor with logs"]
-                    }
+            {
+                "phase": "Phase 3: Advanced & Professional",
+                "duration": "2 months",
+                "skills": ["TypeScript", "State management (Redux/Zustand)", "Testing", "Performance"],
+                "resources": [
+                    {"title": "TypeScript Handbook", "type": "docs", "url": "https://www.typescriptlang.org", "duration": "2 weeks"},
+                    {"title": "Testing JavaScript", "type": "course", "url": "https://testingjavascript.com", "duration": "4 weeks"},
+                    {"title": "Web Performance Fundamentals", "type": "course", "url": "https://frontendmasters.com", "duration": "3 hours"}
                 ],
-                "certifications": [
-                    "AWS Certified Developer Associate",
-                    "Microsoft Certified: Azure Developer Associate"
+                "projects": ["Full-stack CRUD app", "Real-time chat app", "Portfolio with CMS"],
+                "milestones": ["Convert project to TypeScript", "Achieve 90+ Lighthouse score", "Write unit tests"]
+            }
+        ],
+        "certifications": [
+            "Meta Front-End Developer Professional Certificate",
+            "Microsoft Certified: Azure Developer Associate (optional)"
+        ],
+        "job_search_tips": [
+            "Build 5+ projects showcasing different skills",
+            "Contribute to open source React projects",
+            "Write technical blog posts",
+            "Network on Twitter and LinkedIn",
+            "Practice LeetCode easy/medium problems"
+        ],
+        "salary_range": "$60k-$120k (varies by location and experience)",
+        "industry_trends": [
+            "Server components and Next.js 14+",
+            "AI-assisted development",
+            "Web3 and blockchain frontends",
+            "Micro-frontends architecture"
+        ]
+    },
+    "backend": {
+        "role": "Backend Developer",
+        "timeline": "6 months",
+        "overview": "Backend developers build server-side logic, APIs, and database systems that power applications.",
+        "skill_gaps": ["API design", "Database optimization", "Authentication", "Caching", "DevOps basics"],
+        "phases": [
+            {
+                "phase": "Phase 1: Programming & Databases",
+                "duration": "2 months",
+                "skills": ["Python/Node.js", "SQL", "REST APIs", "Git"],
+                "resources": [
+                    {"title": "Python for Everybody", "type": "course", "url": "https://www.py4e.com", "duration": "8 weeks"},
+                    {"title": "SQL Tutorial - W3Schools", "type": "tutorial", "url": "https://www.w3schools.com/sql", "duration": "2 weeks"},
+                    {"title": "FastAPI/Django/Express Tutorial", "type": "tutorial", "url": "official docs", "duration": "4 weeks"}
+                ],
+                "projects": ["Simple CRUD API", "Blog API", "User authentication system"],
+                "milestones": ["Build 3 REST APIs", "Master SQL queries", "Deploy to Heroku/Render"]
+            },
+            {
+                "phase": "Phase 2: Advanced Backend",
+                "duration": "2 months",
+                "skills": ["Database design", "Caching (Redis)", "Message queues", "Security"],
+                "resources": [
+                    {"title": "System Design Primer", "type": "github", "url": "https://github.com/donnemartin/system-design-primer", "duration": "ongoing"},
+                    {"title": "Designing Data-Intensive Applications", "type": "book", "url": "amazon", "duration": "8 weeks"}
                 ],
-                "job_search_tips": [
-                    "Build scalable systems",
-                    "Master system design interviews",
-                    "Contribute to backend frameworks",
-                    "Learn microservices patterns"
+                "projects": ["E-commerce backend", "Real-time notification service", "File upload system"],
+                "milestones": ["Implement caching", "Add JWT auth", "Handle 1000+ requests/sec"]
+            },
+            {
+                "phase": "Phase 3: DevOps & Scale",
+                "duration": "2 months",
+                "skills": ["Docker", "CI/CD", "AWS/Azure", "Monitoring"],
+                "resources": [
+                    {"title": "Docker Mastery", "type": "course", "url": "udemy", "duration": "20 hours"},
+                    {"title": "AWS Certified Developer", "type": "certification", "url": "aws.amazon.com", "duration": "6 weeks"}
                 ],
-                "salary_range": "$70k-$140k",
-                "industry_trends": [
-                    "Serverless architecture",
-                    "GraphQL over REST",
-                    "Event-driven systems",
-                    "Edge computing"
-                ]
+                "projects": ["Dockerize apps", "Set up CI/CD pipeline", "Deploy to AWS"],
+                "milestones": ["Containerize all projects", "Automate deployments", "Monitor with logs"]
             }
-        }
+        ],
+        "certifications": [
+            "AWS Certified Developer Associate",
+            "Microsoft Certified: Azure Developer Associate"
+        ],
+        "job_search_tips": [
+            "Build scalable systems",
+            "Master system design interviews",
+            "Contribute to backend frameworks",
+            "Learn microservices patterns"
+        ],
+        "salary_range": "$70k-$140k",
+        "industry_trends": [
+            "Serverless architecture",
+            "GraphQL over REST",
+            "Event-driven systems",
+            "Edge computing"
+        ]
+    }
+})
+
+# Longest key first so the alternation prefers the most specific template
+_TEMPLATE_RE: Final = re.compile("|".join(sorted(map(re.escape, _ROADMAP_TEMPLATES), key=len, reverse=True)))
+
+# Every substring of a template key, mapped to the first key containing it
+_TEMPLATE_FRAGMENTS: Final[Mapping[str, str]] = MappingProxyType({
+    fragment: key
+    for key in reversed(tuple(_ROADMAP_TEMPLATES))
+    for start in range(len(key) + 1)
+    for fragment in (key[start:end] for end in range(start, len(key) + 1))
+})
 
 # Create global instance
 career_advisor = CareerAdvisor()
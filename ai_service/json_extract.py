@@ -0,0 +1,107 @@
+"""
+JSON Extraction Helpers
+Recovers a JSON object from free-form LLM output without another API round trip
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, Optional
+
+# Optional import - faster JSON parsing for large model outputs
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional import - last-resort repair of malformed JSON
+try:
+    import json_repair
+    JSON_REPAIR_AVAILABLE = True
+except ImportError:
+    JSON_REPAIR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_FENCED_BLOCK_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_GREEDY_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+
+
+def _loads_object(candidate: str) -> Optional[Dict[str, Any]]:
+    """Parse a candidate string, returning it only if it is a JSON object"""
+    try:
+        # orjson.JSONDecodeError subclasses ValueError
+        value = orjson.loads(candidate) if ORJSON_AVAILABLE else json.loads(candidate)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _iter_balanced_objects(text: str) -> Iterator[str]:
+    """Yield top-level `{...}` spans, ignoring braces inside string literals"""
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            # Quotes only matter once we are inside an object
+            in_string = depth > 0
+        elif char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """
+    Extract the first JSON object from model output
+
+    Tries, in order: the whole text, fenced code blocks, balanced-brace spans,
+    a greedy brace match, and finally json_repair if it is installed.
+
+    Raises:
+        ValueError: If no JSON object can be recovered
+    """
+    stripped = text.strip()
+
+    result = _loads_object(stripped)
+    if result is not None:
+        return result
+
+    for match in _FENCED_BLOCK_RE.finditer(stripped):
+        result = _loads_object(match.group(1).strip())
+        if result is not None:
+            return result
+
+    for candidate in _iter_balanced_objects(stripped):
+        result = _loads_object(candidate)
+        if result is not None:
+            return result
+
+    match = _GREEDY_OBJECT_RE.search(stripped)
+    if match:
+        result = _loads_object(match.group(0))
+        if result is not None:
+            return result
+
+    if JSON_REPAIR_AVAILABLE:
+        repaired = json_repair.loads(stripped)
+        if isinstance(repaired, dict) and repaired:
+            logger.info("Recovered model JSON with json_repair")
+            return repaired
+
+    raise ValueError("No JSON object found in model output")
@@ -0,0 +1,167 @@
+"""
+Keyword Matcher
+Finds every occurrence of a fixed set of keywords in one pass over the text
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+# Optional import - Aho-Corasick automaton for single-pass matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logging.warning("pyahocorasick not available, keyword matching will scan per keyword")
+
+# Without pyahocorasick, keyword sets at least this large are matched by walking
+# a pure-Python trie (cost grows with text length only) rather than one C-level
+# str.find scan per keyword (cost grows with keyword count). Measured crossover
+# on ~6 KB resumes is around 250-300 keywords.
+TRIE_MIN_KEYWORDS = 256
+
+# Trie node key marking the end of a keyword
+_KEYWORD_END = None
+
+
+def _is_word_char(char: str) -> bool:
+    """Same definition of a word character as the `\\w` regex class"""
+    return char.isalnum() or char == "_"
+
+
+def _at_word_boundary(text: str, start: int, end: int) -> bool:
+    """True if text[start:end] is surrounded by `\\b` boundaries, as in r'\\bkeyword\\b'"""
+    before = start > 0 and _is_word_char(text[start - 1])
+    after = end < len(text) and _is_word_char(text[end])
+    return before != _is_word_char(text[start]) and after != _is_word_char(text[end - 1])
+
+
+def iter_word_occurrences(text: str, word: str, word_boundaries: bool = True) -> Iterator[int]:
+    """
+    Yield start offsets of non-overlapping occurrences of word in text
+
+    Gives the same matches as re.finditer(r'\\bword\\b', text), but the literal
+    search is done by str.find instead of the regex engine.
+    """
+    if not word:
+        return
+
+    size = len(word)
+    pos = text.find(word)
+    while pos != -1:
+        if not word_boundaries or _at_word_boundary(text, pos, pos + size):
+            yield pos
+            pos = text.find(word, pos + size)
+        else:
+            pos = text.find(word, pos + 1)
+
+
+def count_word_occurrences(text: str, word: str) -> int:
+    """Count whole-word occurrences of word in text (as len(re.findall(r'\\bword\\b', text)))"""
+    return sum(1 for _ in iter_word_occurrences(text, word))
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher built once and reused across calls
+
+    Each keyword maps to one or more values. Keywords are lowercased when the
+    matcher is built and matching is case-sensitive, so callers should pass
+    lowercased text. With word_boundaries=True a keyword only matches where
+    r'\\bkeyword\\b' would.
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, so the
+    cost is one scan of the text however many keywords there are. Otherwise
+    falls back to a str.find scan per keyword, or to a trie walk for large
+    keyword sets (see TRIE_MIN_KEYWORDS).
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]], word_boundaries: bool = True):
+        """
+        Args:
+            keywords: (keyword, value) pairs; a keyword may appear more than once
+            word_boundaries: Only match keywords as whole words
+        """
+        self.word_boundaries = word_boundaries
+        self._values: Dict[str, List[Any]] = {}
+
+        for keyword, value in keywords:
+            keyword = keyword.lower()
+            if keyword:
+                self._values.setdefault(keyword, []).append(value)
+
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._values:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+            self._trie = None
+        else:
+            self._automaton = None
+            self._trie = self._build_trie() if len(self._values) >= TRIE_MIN_KEYWORDS else None
+
+    def _build_trie(self) -> Dict[Any, Any]:
+        """Build a nested-dict trie of the keywords, character by character"""
+        root: Dict[Any, Any] = {}
+        for keyword in self._values:
+            node = root
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_KEYWORD_END] = keyword
+        return root
+
+    def _iter_trie_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Walk the trie from each position, so keywords sharing a prefix are tested together"""
+        text_length = len(text)
+
+        for start in range(text_length):
+            node = self._trie.get(text[start])
+            end = start + 1
+            while node is not None:
+                keyword = node.get(_KEYWORD_END)
+                if keyword is not None and (
+                    not self.word_boundaries or _at_word_boundary(text, start, end)
+                ):
+                    yield start, keyword
+                if end == text_length:
+                    break
+                node = node.get(text[end])
+                end += 1
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (start, keyword) for each keyword occurrence in text
+
+        The automaton reports overlapping occurrences in order of where they
+        end, the trie in order of where they start, and the str.find fallback
+        keyword by keyword.
+        """
+        if self._automaton is None and self._trie is not None:
+            yield from self._iter_trie_matches(text)
+            return
+
+        if self._automaton is None:
+            for keyword in self._values:
+                for start in iter_word_occurrences(text, keyword, self.word_boundaries):
+                    yield start, keyword
+            return
+
+        if not self._values:
+            return
+
+        for end_index, keyword in self._automaton.iter(text):
+            start = end_index - len(keyword) + 1
+            if not self.word_boundaries or _at_word_boundary(text, start, end_index + 1):
+                yield start, keyword
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords that occur in text"""
+        return {keyword for _, keyword in self.iter_matches(text)}
+
+    def values_of(self, keyword: str) -> List[Any]:
+        """Return the values registered for a (lowercased) keyword"""
+        return self._values[keyword]
+
+    def find_values(self, text: str) -> Set[Any]:
+        """Return the values of all keywords that occur in text"""
+        return {value for keyword in self.find(text) for value in self._values[keyword]}
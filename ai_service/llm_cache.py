@@ -0,0 +1,133 @@
+"""
+LLM Response Cache
+Caches OpenAI responses keyed by a hash of the canonical request payload
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+# Optional import - faster serialization for cache keys and Redis values
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional Redis backend for multi-instance deployments
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """Return the SHA-256 hex digest of the canonical JSON form of a payload"""
+    if ORJSON_AVAILABLE:
+        canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    else:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.sha256(canonical).hexdigest()
+
+
+class CacheBackend(Protocol):
+    """Storage interface used by LLMCache"""
+
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ...
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at and expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class RedisBackend:
+    """Redis-backed cache storing JSON-encoded values"""
+
+    def __init__(self, url: str, prefix: str = "skilllens:llm:"):
+        self._client = aioredis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self._prefix + key)
+        if raw is None:
+            return None
+        return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        raw = orjson.dumps(value) if ORJSON_AVAILABLE else json.dumps(value)
+        await self._client.set(self._prefix + key, raw, ex=ttl)
+
+
+class LLMCache:
+    """
+    Cache facade for LLM responses.
+    Backend failures are logged and treated as cache misses so they never
+    break a request.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        try:
+            await self.backend.set(key, value, ttl=ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+
+def create_llm_cache() -> LLMCache:
+    """Factory function to create the LLM cache from environment settings"""
+    backend_name = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+
+    if backend_name == "redis":
+        if REDIS_AVAILABLE:
+            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            logger.info("LLM cache using Redis backend")
+            return LLMCache(RedisBackend(redis_url))
+        logger.warning("redis package not installed, falling back to in-memory LLM cache")
+
+    max_size = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+    return LLMCache(MemoryBackend(max_size=max_size))
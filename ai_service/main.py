@@ -1,35 +1,166 @@
-import spacy
-import re
-from typing import List, Dict, Any, Optional
+import asyncio
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import FastAPI, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel, Field
 import uvicorn
 import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-# Import our custom NLP engine
-from nlp_engine import create_skill_extractor, create_job_role_matcher
-from career_advisor import career_advisor
+# The NLP engine (spaCy, transformers) is imported lazily by init_nlp_components
+from career_advisor import career_advisor, close_openai_client
+from keyword_matcher import KeywordMatcher
+from spacy_batcher import SpacyBatcher
+from text_cache import LRUCache, text_digest
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Optional import - faster serialization of large skill and roadmap responses
+try:
+    import orjson  # ORJSONResponse imports without it but fails at render time
+    from fastapi.responses import ORJSONResponse
+    DefaultResponse = ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    DefaultResponse = JSONResponse
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson not available, using standard JSON responses")
+
+def dumps_json(value: Any) -> str:
+    """Serialize a value to a JSON string, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+def start_log_listener() -> QueueListener:
+    """
+    Move the root logger's handlers onto a background thread
+    
+    Log calls then only enqueue the record, so formatting and stream/file
+    I/O never block the event loop.
+    """
+    root_logger = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+    root_logger.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+def stop_log_listener(listener: QueueListener):
+    """Flush queued records and restore the original handlers"""
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
+# Caps concurrent CPU-bound NLP calls so a burst of requests queues up instead
+# of thrashing the GIL; worker threads come from a pool sized to the machine
+CPU_COUNT = os.cpu_count() or 1
+NLP_CONCURRENCY = int(os.getenv("NLP_CONCURRENCY", str(CPU_COUNT)))
+nlp_semaphore = asyncio.Semaphore(NLP_CONCURRENCY)
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Run blocking NLP work in a worker thread, at most NLP_CONCURRENCY at a time"""
+    async with nlp_semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+# Caps in-flight LLM calls so a burst of chat or roadmap requests waits its turn
+# instead of exhausting the upstream API quota
+CHAT_CONCURRENCY = int(os.getenv("CHAT_CONCURRENCY", "16"))
+ROADMAP_CONCURRENCY = int(os.getenv("ROADMAP_CONCURRENCY", "8"))
+chat_semaphore = asyncio.Semaphore(CHAT_CONCURRENCY)
+roadmap_semaphore = asyncio.Semaphore(ROADMAP_CONCURRENCY)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up and release shared resources for the app's lifetime"""
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=CPU_COUNT * 2, thread_name_prefix="nlp")
+    )
+    log_listener = start_log_listener()
+    # Load models in the background so the server accepts requests (and / and /health
+    # answer) right away; endpoints that need the NLP engine wait on nlp_ready
+    nlp_init_task = asyncio.create_task(init_nlp_components())
+    yield
+    if not nlp_init_task.done():
+        nlp_init_task.cancel()
+    if spacy_batcher:
+        await spacy_batcher.close()
+    if skill_extractor and skill_extractor.semantic_cache:
+        # Persist entries added since the last periodic save
+        await asyncio.to_thread(skill_extractor.semantic_cache.save)
+    await close_openai_client()
+    stop_log_listener(log_listener)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="SkillLens AI Service",
     description="AI-powered skill extraction from resumes and job descriptions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse,
+    lifespan=lifespan
 )
 
-# Initialize NLP components
-try:
-    skill_extractor = create_skill_extractor()
-    job_matcher = create_job_role_matcher()
-    logger.info("NLP engine initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize NLP engine: {e}")
-    skill_extractor = None
-    job_matcher = None
+# Categorized skill lists and roadmaps compress well; skip tiny responses
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
+# NLP components, set by init_nlp_components once the models have loaded
+skill_extractor = None
+job_matcher = None
+# Parses documents from concurrent requests together with nlp.pipe
+spacy_batcher = None
+# Set when NLP initialization has finished, whether or not it succeeded
+nlp_ready = asyncio.Event()
+# Why NLP initialization failed, if it did
+nlp_init_error: Optional[str] = None
+
+def load_nlp_components():
+    """Import the NLP engine and build the skill extractor and job role matcher (blocking)"""
+    from nlp_engine import create_skill_extractor, create_job_role_matcher
+    return create_skill_extractor(), create_job_role_matcher()
+
+async def init_nlp_components():
+    """
+    Load the NLP components in a worker thread, then warm up the spaCy pipeline
+    
+    The components are published together once all of them are ready. If any step
+    fails they all stay None, so /extract falls back to keyword matching and
+    /match-job-roles answers 503.
+    """
+    global skill_extractor, job_matcher, spacy_batcher, nlp_init_error
+    batcher = None
+    try:
+        extractor, matcher = await asyncio.to_thread(load_nlp_components)
+        logger.info("NLP engine initialized successfully")
+        
+        batcher = SpacyBatcher(extractor.nlp)
+        # Run one document through the pipeline so the first request doesn't pay for warm-up
+        await batcher.submit("warmup")
+        logger.info("spaCy pipeline warmed up")
+        
+        skill_extractor, job_matcher, spacy_batcher = extractor, matcher, batcher
+    except Exception as e:
+        nlp_init_error = str(e)
+        logger.error(f"Failed to initialize NLP engine: {e}")
+        if batcher:
+            await batcher.close()
+    finally:
+        nlp_ready.set()
+
+# Recent /extract responses keyed by (digest of the input text, extraction method),
+# so re-submitted resumes and job descriptions skip the NLP pipeline
+extract_cache = LRUCache(
+    max_size=int(os.getenv("EXTRACT_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("EXTRACT_CACHE_TTL", "3600"))
+)
 
 # Request/Response models
 class SkillExtractionRequest(BaseModel):
@@ -53,6 +184,7 @@ class ChatRequest(BaseModel):
     message: str
     history: List[Dict[str, str]] = []
     user_profile: Optional[Dict[str, Any]] = Field(None, alias='userProfile')
+    session_id: Optional[str] = Field(None, alias='sessionId')
 
     class Config:
         populate_by_name = True
@@ -71,7 +203,7 @@ class RoadmapRequest(BaseModel):
         populate_by_name = True
 
 # Legacy skill categories for fallback
-SKILL_CATEGORIES = {
+_RAW_SKILL_CATEGORIES = {
     "Programming Languages": [
         "python", "javascript", "java", "c++", "c#", "typescript", "php", "ruby", "go", "rust",
         "swift", "kotlin", "scala", "r", "matlab", "sql", "html", "css", "bash", "powershell"
@@ -102,63 +234,71 @@ SKILL_CATEGORIES = {
     ]
 }
 
-def extract_skills_with_spacy(text: str) -> List[str]:
-    """Extract skills using spaCy NLP processing"""
-    # Load spaCy model if not already loaded
-    global nlp
-    if "nlp" not in globals() or nlp is None:
-        try:
-            nlp = spacy.load("en_core_web_sm")
-        except Exception as e:
-            logger.error(f"Failed to load spaCy model: {e}")
-            return []
-    
-    doc = nlp(text.lower())
-    extracted_skills = set()
-    
-    # Extract entities that might be skills
-    for ent in doc.ents:
-        if ent.label_ in ["ORG", "PRODUCT", "LANGUAGE"]:
-            extracted_skills.add(ent.text.strip())
+# Normalized once at import: lowercased, de-duplicated and frozen into tuples
+# so request handlers can share them across threads without copying
+SKILL_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    category: tuple(dict.fromkeys(skill.lower() for skill in skills))
+    for category, skills in _RAW_SKILL_CATEGORIES.items()
+}
+
+ALL_SKILLS: Tuple[str, ...] = tuple(dict.fromkeys(
+    skill for skills in SKILL_CATEGORIES.values() for skill in skills
+))
+
+# Category of every skill (the first one listed, if a skill appears in several)
+SKILL_TO_CATEGORY: Dict[str, str] = {
+    skill: category
+    for category, skills in reversed(SKILL_CATEGORIES.items())
+    for skill in skills
+}
+
+# One automaton over every skill, tagged with its position in ALL_SKILLS
+# so matches can be grouped back in the original order
+SKILL_MATCHER = KeywordMatcher((skill, (order, skill)) for order, skill in enumerate(ALL_SKILLS))
+
+@dataclass
+class KeywordExtraction:
+    """Skills found by keyword matching, with their confidence scores"""
+    categories: Dict[str, List[str]]
+    skills: List[str]
+    confidence_scores: Dict[str, float]
+
+def extract_skills_with_keywords(text_lower: str, word_count: int) -> KeywordExtraction:
+    """
+    Extract skills using predefined keyword matching, scoring them in the same pass
     
-    # Extract noun phrases that might be technical skills
-    for chunk in doc.noun_chunks:
-        if len(chunk.text.split()) <= 3:  # Keep phrases short
-            extracted_skills.add(chunk.text.strip())
+    Args:
+        text_lower: Lowercased input text
+        word_count: Number of whitespace-separated words in the text
+    """
+    # Single pass over the text, matching whole words and counting occurrences
+    occurrences = count_skill_occurrences(text_lower)
     
-    return list(extracted_skills)
-
-def extract_skills_with_keywords(text: str) -> Dict[str, List[str]]:
-    """Extract skills using predefined keyword matching"""
-    text_lower = text.lower()
     categorized_skills = {}
+    unique_skills = []
+    seen = set()
     
-    for category, skills in SKILL_CATEGORIES.items():
-        found_skills = []
-        for skill in skills:
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.append(skill)
-        
-        if found_skills:
-            categorized_skills[category] = found_skills
-    
-    return categorized_skills
-
-def calculate_confidence_scores(skills: List[str], text: str) -> Dict[str, float]:
-    """Calculate confidence scores for extracted skills"""
-    text_lower = text.lower()
-    scores = {}
+    # Matches in vocabulary order are already grouped by category, so the
+    # flat, de-duplicated skill list is built in the same loop
+    matched = sorted(value for keyword in occurrences for value in SKILL_MATCHER.values_of(keyword))
+    for _, skill in matched:
+        categorized_skills.setdefault(SKILL_TO_CATEGORY[skill], []).append(skill)
+        if skill not in seen:
+            seen.add(skill)
+            unique_skills.append(skill)
     
-    for skill in skills:
-        # Count occurrences
-        occurrences = len(re.findall(r'\b' + re.escape(skill.lower()) + r'\b', text_lower))
-        # Normalize by text length (simple heuristic)
-        confidence = min(occurrences / max(len(text.split()) / 100, 1), 1.0)
-        scores[skill] = round(confidence, 2)
+    # Normalize by text length (simple heuristic)
+    length_factor = max(word_count / 100, 1)
+    confidence_scores = {
+        skill: round(min(occurrences[skill] / length_factor, 1.0), 2)
+        for skill in unique_skills
+    }
     
-    return scores
+    return KeywordExtraction(categorized_skills, unique_skills, confidence_scores)
+
+def count_skill_occurrences(text_lower: str) -> Counter:
+    """Count whole-word occurrences of every legacy skill in one pass over the text"""
+    return Counter(keyword for _, keyword in SKILL_MATCHER.iter_matches(text_lower))
 
 @app.get("/")
 async def root():
@@ -180,38 +320,55 @@ async def extract_skills(request: SkillExtractionRequest):
         if not request.text or len(request.text.strip()) < 10:
             raise HTTPException(status_code=400, detail="Text is too short or empty")
         
+        await nlp_ready.wait()
+        
+        # The NLP engine and the keyword fallback give different results for the same text
+        method = "engine" if skill_extractor else "keywords"
+        cache_key = (text_digest(request.text), method)
+        cached_response = extract_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("Serving skill extraction from cache")
+            return cached_response
+        
         # Use advanced NLP engine if available
         if skill_extractor:
             logger.info("Using advanced NLP engine for skill extraction")
-            result = skill_extractor.extract_skills(request.text, use_all_methods=True)
+            # Pattern matching and HuggingFace run in worker threads (capped by
+            # nlp_semaphore) while the OpenAI call is awaited; the batcher parses the
+            # text only if the extractor needs NER
+            result = await skill_extractor.extract_skills_async(
+                request.text, use_all_methods=True, parse=spacy_batcher.submit, run=run_cpu_bound
+            )
             
-            return SkillExtractionResponse(
+            # Built from our own engine output, so skip re-validating it here
+            response = SkillExtractionResponse.model_construct(
                 skills=result["skills"],
                 categories=result["categories"],
                 confidence_scores=result["confidence_scores"]
             )
+            # The engine doesn't cache results missing a failed method's skills; neither do we
+            cacheable = skill_extractor.has_cached_result(request.text, use_all_methods=True)
+        else:
+            # Fallback to legacy extraction method
+            logger.warning("Using fallback skill extraction method")
+            # Lowercased and counted here, once; the engine path needs neither
+            extraction = await run_cpu_bound(
+                extract_skills_with_keywords, request.text.lower(), len(request.text.split())
+            )
+            
+            response = SkillExtractionResponse.model_construct(
+                skills=extraction.skills,
+                categories=extraction.categories,
+                confidence_scores=extraction.confidence_scores
+            )
+            cacheable = True
         
-        # Fallback to legacy extraction method
-        logger.warning("Using fallback skill extraction method")
-        categorized_skills = extract_skills_with_keywords(request.text)
-        
-        # Flatten all skills
-        all_skills = []
-        for skills_list in categorized_skills.values():
-            all_skills.extend(skills_list)
-        
-        # Remove duplicates while preserving order
-        unique_skills = list(dict.fromkeys(all_skills))
-        
-        # Calculate confidence scores
-        confidence_scores = calculate_confidence_scores(unique_skills, request.text)
-        
-        return SkillExtractionResponse(
-            skills=unique_skills,
-            categories=categorized_skills,
-            confidence_scores=confidence_scores
-        )
+        if cacheable:
+            extract_cache.set(cache_key, response)
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Skill extraction failed: {str(e)}")
 
@@ -230,14 +387,16 @@ async def match_job_roles(request: JobMatchRequest):
         if not request.skills:
             raise HTTPException(status_code=400, detail="No skills provided")
         
+        await nlp_ready.wait()
+        
         if job_matcher:
             # Get suggested roles
-            suggested_roles = job_matcher.suggest_best_roles(request.skills, top_n=5)
+            suggested_roles = await run_cpu_bound(job_matcher.suggest_best_roles, request.skills, top_n=5)
             
             # If target role specified, calculate specific fit
             best_fit = None
             if request.target_role:
-                best_fit = job_matcher.calculate_role_fit(request.skills, request.target_role)
+                best_fit = await run_cpu_bound(job_matcher.calculate_role_fit, request.skills, request.target_role)
                 best_fit["role"] = request.target_role
             
             return JobMatchResponse(
@@ -245,8 +404,13 @@ async def match_job_roles(request: JobMatchRequest):
                 best_fit=best_fit
             )
         else:
-            raise HTTPException(status_code=503, detail="Job matching service not available")
+            detail = "Job matching service not available"
+            if nlp_init_error:
+                detail += f": NLP engine failed to initialize ({nlp_init_error})"
+            raise HTTPException(status_code=503, detail=detail)
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Job matching failed: {str(e)}")
 
@@ -264,19 +428,68 @@ async def chat_endpoint(request: ChatRequest):
     try:
         logger.info(f"💬 Chat request: '{request.message[:50]}...'")
         
-        response = await career_advisor.generate_chat_response(
-            message=request.message,
-            history=request.history,
-            user_profile=request.user_profile
-        )
+        async with chat_semaphore:
+            response = await career_advisor.generate_chat_response(
+                message=request.message,
+                history=request.history,
+                user_profile=request.user_profile,
+                session_id=request.session_id
+            )
         
-        logger.info(f"✅ Chat response generated")
+        logger.info("✅ Chat response generated")
         return ChatResponse(**response)
     
     except Exception as e:
         logger.error(f"❌ Chat error: {e}")
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Stream a reply from the AI Career Coach as Server-Sent Events
+    
+    Args:
+        request: ChatRequest with message, history, and user profile
+    
+    Returns:
+        text/event-stream of `{"delta": ...}` chunks, followed by a `done`
+        event carrying the full ChatResponse payload
+    """
+    logger.info(f"💬 Streaming chat request: '{request.message[:50]}...'")
+    
+    async def event_stream():
+        parts = []
+        try:
+            # Held for the whole stream, since the upstream call lasts that long
+            async with chat_semaphore:
+                async for delta in career_advisor.generate_chat_response_stream(
+                    message=request.message,
+                    history=request.history,
+                    user_profile=request.user_profile,
+                    session_id=request.session_id
+                ):
+                    if delta:
+                        parts.append(delta)
+                        yield f"data: {dumps_json({'delta': delta})}\n\n"
+            
+            # Structured data and suggestions need the complete reply
+            response = career_advisor.finalize_chat_response(
+                request.message, "".join(parts), request.user_profile
+            )
+            yield f"event: done\ndata: {dumps_json(response)}\n\n"
+            logger.info("✅ Chat stream completed")
+        
+        except Exception as e:
+            logger.error(f"❌ Chat stream error: {e}")
+            yield f"event: error\ndata: {dumps_json({'detail': f'Chat failed: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # An explicit encoding stops GZipMiddleware from buffering the stream
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"}
+    )
+
 @app.post("/roadmap")
 async def generate_roadmap(request: RoadmapRequest):
     """
@@ -291,11 +504,12 @@ async def generate_roadmap(request: RoadmapRequest):
     try:
         logger.info(f"🗺️ Roadmap request for: {request.target_role}")
         
-        roadmap = await career_advisor.generate_career_roadmap(
-            target_role=request.target_role,
-            current_skills=request.current_skills,
-            timeline=request.timeline
-        )
+        async with roadmap_semaphore:
+            roadmap = await career_advisor.generate_career_roadmap(
+                target_role=request.target_role,
+                current_skills=request.current_skills,
+                timeline=request.timeline
+            )
         
         logger.info(f"✅ Roadmap generated for {request.target_role}")
         return roadmap
@@ -307,8 +521,13 @@ async def generate_roadmap(request: RoadmapRequest):
 @app.get("/health")
 async def health_check():
     """Detailed health check with service status"""
-    nlp_engine_status = "available" if skill_extractor else "unavailable"
-    job_matcher_status = "available" if job_matcher else "unavailable"
+    if not nlp_ready.is_set():
+        nlp_engine_status = job_matcher_status = "loading"
+    elif nlp_init_error:
+        nlp_engine_status = job_matcher_status = "failed"
+    else:
+        nlp_engine_status = "available" if skill_extractor else "unavailable"
+        job_matcher_status = "available" if job_matcher else "unavailable"
     career_advisor_status = "available" if career_advisor else "unavailable"
     
     return {
@@ -317,6 +536,7 @@ async def health_check():
         "service": "SkillLens AI Career Coach",
         "version": "2.0.0",
         "nlp_engine": nlp_engine_status,
+        "spacy_pipeline": skill_extractor.nlp.pipe_names if skill_extractor else [],
         "job_matcher": job_matcher_status,
         "career_advisor": career_advisor_status
     }
@@ -3,14 +3,24 @@ SkillLens NLP Engine
 Advanced skill extraction using spaCy, HuggingFace, and OpenAI
 """
 
+import asyncio
 import spacy
+import numpy as np
 import re
+import functools
 import logging
 import os
+import threading
+import time
 from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict, Counter
 import json
+import copy
 from dotenv import load_dotenv  # This line is retained for loading environment variables
+from keyword_matcher import KeywordMatcher
+from spacy_batcher import SPACY_BATCH_SIZE
+from text_cache import LRUCache, text_digest
+from semantic_cache import create_semantic_cache, embed_text
 
 # Load environment variables
 load_dotenv()
@@ -23,23 +33,230 @@ except (ImportError, Exception) as e:
     TRANSFORMERS_AVAILABLE = False
     logging.warning(f"Transformers not available: {e}")
 
+# Optional import - int8 ONNX Runtime version of the zero-shot classifier (HF_QUANTIZED)
 try:
-    try:
-        import openai
-        OPENAI_AVAILABLE = True
-    except ImportError:
-        openai = None
-        OPENAI_AVAILABLE = False
-        logging.warning("OpenAI package not installed. Install with: pip install openai")
-    OPENAI_AVAILABLE = True
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    OPTIMUM_AVAILABLE = True
 except (ImportError, Exception) as e:
+    OPTIMUM_AVAILABLE = False
+    logging.warning(f"Optimum ONNX Runtime not available: {e}")
+
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+    logging.warning("Hyperscan not available, skill patterns will be matched in Python")
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    openai = None
     OPENAI_AVAILABLE = False
-    logging.warning(f"OpenAI not available: {e}")
+    logging.warning("OpenAI package not installed. Install with: pip install openai")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# A pattern of the form r"\bliteral\b" whose literal has no regex syntax left once
+# escaped characters are removed, i.e. one KeywordMatcher can match it
+_WORD_LITERAL_RE = re.compile(r"\\b((?:\\.|[^.^$*+?{}\[\]|()\\])+)\\b")
+_ESCAPE_RE = re.compile(r"\\(.)")
+
+# Hyperscan's \b only knows ASCII word characters, so before a scan each non-ASCII
+# character is swapped for an ASCII stand-in of the same class that no pattern
+# contains: "_" for word characters, NUL otherwise. Offsets stay those of the text.
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+def _ascii_stand_in(match: re.Match) -> str:
+    return "_" if match.group().isalnum() else "\x00"
+
+# spaCy components skill extraction never uses (comma-separated SPACY_DISABLE_COMPONENTS).
+# By default only the lemmatizer goes: noun_chunks needs the parser plus coarse POS
+# tags from tagger/attribute_ruler, and the tagger and parser read their features
+# from the shared tok2vec. ner is needed for doc.ents.
+SPACY_EXCLUDED_COMPONENTS = [
+    name.strip()
+    for name in os.getenv("SPACY_DISABLE_COMPONENTS", "lemmatizer").split(",")
+    if name.strip()
+]
+
+# Entity labels that tend to be tools, products or languages, and entity texts to ignore
+SKILL_ENTITY_LABELS = frozenset(("ORG", "PRODUCT", "LANGUAGE"))
+ENTITY_STOPWORDS = frozenset(("the", "and", "for"))
+# Noun phrases containing one of these are treated as potential skills
+NOUN_CHUNK_KEYWORDS = ("development", "programming", "analysis", "design")
+
+# Most extract_skills results kept per SkillExtractor, and seconds each stays valid
+SKILL_CACHE_SIZE = int(os.getenv("SKILL_CACHE_SIZE", "1024"))
+SKILL_CACHE_TTL = float(os.getenv("SKILL_CACHE_TTL", "3600"))
+
+class IncompleteExtraction(tuple):
+    """
+    (skills, confidence scores) from an extraction method that failed or was cut
+    short, so results combined from it are not cached and the next request retries
+    """
+
+# Returned by an extraction method that was asked to run but failed (API error,
+# unparseable output); never modify it
+FAILED_EXTRACTION: Tuple[List[str], Dict[str, float]] = IncompleteExtraction(([], {}))
+
+# Run spaCy and the HuggingFace classifier on the GPU when one is available
+USE_GPU = os.getenv("USE_GPU", "false").lower() == "true"
+
+# Worker processes nlp.pipe uses in extract_skills_batch (-1 for one per CPU)
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+@functools.lru_cache(maxsize=None)
+def get_nlp(spacy_model: str = "en_core_web_sm"):
+    """
+    Return the shared spaCy pipeline for a model, loading it on first use
+    
+    Every caller shares one copy of the model instead of loading its own.
+    Raises OSError if the model is not installed.
+    """
+    # Must run before loading, so the model's weights are allocated on the GPU
+    if USE_GPU and spacy.prefer_gpu():
+        logger.info("spaCy is using the GPU")
+    nlp = spacy.load(spacy_model, exclude=SPACY_EXCLUDED_COMPONENTS)
+    logger.info(f"Loaded spaCy model: {spacy_model} (pipeline: {', '.join(nlp.pipe_names)})")
+    return nlp
+
+# Zero-shot model used by both SkillExtractor and JobRoleMatcher
+DEFAULT_HF_MODEL = "facebook/bart-large-mnli"
+
+def _hf_device_kwargs() -> Dict:
+    """pipeline() arguments that put the model on the first GPU in half precision, if enabled"""
+    if not USE_GPU:
+        return {}
+    
+    try:
+        import torch
+    except ImportError:
+        return {}
+    
+    if not torch.cuda.is_available():
+        logger.warning("USE_GPU is set but no CUDA device is available, running HuggingFace on CPU")
+        return {}
+    return {"device": 0, "torch_dtype": torch.float16}
+
+# Candidate labels for zero-shot skill classification, kept short for fast CPU
+# inference: high-level categories and ambiguous terms
+HF_CANDIDATE_SKILLS = [
+    "web development", "frontend development", "backend development", "full stack development",
+    "machine learning", "data science", "data analysis",
+    "cloud computing", "devops practices", "software engineering",
+    "mobile development", "database management", "api development",
+    "agile methodology", "project management", "leadership skills"
+]
+
+# Everything but the text being analyzed, sent first and identically on every call
+# so the provider can reuse its cached prompt prefix
+SKILL_EXTRACTION_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are an expert HR analyst specializing in technical skill extraction from resumes and profiles.
+Analyze the text you are given and extract ALL technical skills, programming languages, frameworks, 
+tools, databases, cloud platforms, and relevant professional skills.
+
+For each skill, assign a confidence score from 0.1 to 1.0 based on:
+- How explicitly mentioned it is
+- Context and depth of experience indicated
+- Number of occurrences and variations
+
+Return each skill with its name and confidence.
+
+Include skills from these categories:
+- Programming languages (Python, Java, JavaScript, etc.)
+- Web frameworks (React, Django, Express, etc.)
+- Databases (MySQL, MongoDB, PostgreSQL, etc.)
+- Cloud platforms (AWS, Azure, GCP, etc.)
+- DevOps tools (Docker, Kubernetes, Jenkins, etc.)
+- Data science tools (pandas, numpy, TensorFlow, etc.)
+- Soft skills (leadership, communication, etc.)"""
+}
+
+# Structured output for OpenAI skill extraction. Strict schemas can't have free-form
+# object keys, so each skill carries its own confidence instead of a name -> score map
+SKILL_EXTRACTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "skills",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "skills": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "confidence": {"type": "number"}
+                        },
+                        "required": ["name", "confidence"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["skills"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# One complete {"name": ..., "confidence": ...} entry, for salvaging output cut off at max_tokens
+SKILL_ENTRY_PATTERN = re.compile(
+    r'\{\s*"name"\s*:\s*("(?:[^"\\]|\\.)*")\s*,\s*"confidence"\s*:\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*\}'
+)
+
+# Run the zero-shot classifier as a dynamically int8-quantized ONNX model; the
+# exported model is kept under HF_QUANTIZED_DIR so later starts skip the export
+HF_QUANTIZED = os.getenv("HF_QUANTIZED", "false").lower() == "true"
+HF_QUANTIZED_DIR = os.getenv("HF_QUANTIZED_DIR", os.path.join(os.path.dirname(__file__), ".onnx_models"))
+
+def _load_quantized_classifier(model_name: str):
+    """Export a model to ONNX, quantize its weights to int8 and wrap it in a zero-shot pipeline"""
+    save_dir = os.path.join(HF_QUANTIZED_DIR, model_name.replace("/", "--"))
+    
+    if not os.path.exists(os.path.join(save_dir, "model_quantized.onnx")):
+        logger.info(f"Quantizing {model_name} to int8 ONNX (first run only)")
+        ort_model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        quantizer = ORTQuantizer.from_pretrained(ort_model)
+        quantizer.quantize(
+            save_dir=save_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+    
+    model = ORTModelForSequenceClassification.from_pretrained(save_dir, file_name="model_quantized.onnx")
+    tokenizer = AutoTokenizer.from_pretrained(save_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+@functools.lru_cache(maxsize=None)
+def get_hf_classifier(model_name: str = DEFAULT_HF_MODEL):
+    """
+    Return the shared HuggingFace zero-shot classifier for a model, loading it on first use
+    
+    SkillExtractor and JobRoleMatcher share one copy of the model (BART-MNLI
+    is ~1.6 GB) instead of each loading its own.
+    """
+    if HF_QUANTIZED:
+        if OPTIMUM_AVAILABLE:
+            try:
+                classifier = _load_quantized_classifier(model_name)
+                logger.info(f"Loaded int8 ONNX HuggingFace model: {model_name}")
+                return classifier
+            except Exception as e:
+                logger.warning(f"Failed to load quantized model, using full precision: {e}")
+        else:
+            logger.warning("HF_QUANTIZED is set but optimum[onnxruntime] is not installed")
+    
+    logger.info(f"Loading HuggingFace model: {model_name}")
+    return pipeline("zero-shot-classification", model=model_name, **_hf_device_kwargs())
+
 class SkillExtractor:
     """
     Advanced skill extraction engine using multiple NLP approaches
@@ -48,8 +265,7 @@ class SkillExtractor:
     def __init__(self, spacy_model: str = "en_core_web_sm"):
         """Initialize the skill extractor with spaCy model"""
         try:
-            self.nlp = spacy.load(spacy_model)
-            logger.info(f"Loaded spaCy model: {spacy_model}")
+            self.nlp = get_nlp(spacy_model)
         except OSError:
             logger.error(f"spaCy model '{spacy_model}' not found. Install with: python -m spacy download {spacy_model}")
             raise
@@ -57,10 +273,39 @@ class SkillExtractor:
         # Initialize skill patterns and categories
         self.skill_patterns = self._load_skill_patterns()
         self.skill_categories = self._load_skill_categories()
+        # Known skills in category-priority order, and a matcher for finding them inside longer skills
+        self._known_skills = tuple(self.skill_categories)
+        self._known_skill_matcher = KeywordMatcher(
+            ((known_skill, index) for index, known_skill in enumerate(self._known_skills)),
+            word_boundaries=False
+        )
+        self._known_substring_index = self._build_known_substring_index()
+        self.pattern_matcher, self.residual_patterns = self._build_pattern_matcher()
+        self.hyperscan_db = self._build_hyperscan_db() if HYPERSCAN_AVAILABLE else None
+        # Hyperscan scratch space can't be shared between concurrent scans
+        self._hyperscan_local = threading.local()
+        
+        # extract_skills results keyed by (digest of the text, use_all_methods)
+        self._result_cache = LRUCache(max_size=SKILL_CACHE_SIZE, ttl=SKILL_CACHE_TTL)
+        
+        # Settings read once here rather than on every extraction
+        self._hf_threshold = float(os.getenv("HF_CONFIDENCE_THRESHOLD", "0.3"))
+        self._openai_max_tokens = int(os.getenv("MAX_TOKENS_OPENAI", "500"))
+        self._use_openai = os.getenv("USE_OPENAI", "false").lower() == "true"
+        # The spaCy parse (tagger, parser, NER) costs far more than the pattern scan and
+        # mostly finds skills the patterns already cover, so by default it only runs
+        # when the patterns found fewer than MIN_SKILLS_FOR_NER skills
+        self._use_spacy_ner = os.getenv("USE_SPACY_NER", "false").lower() == "true"
+        self._min_skills_for_ner = int(os.getenv("MIN_SKILLS_FOR_NER", "8"))
+        # Skip HuggingFace and OpenAI when spaCy already found this many high-confidence
+        # skills spread over at least this many categories
+        self._early_exit_min_skills = int(os.getenv("EARLY_EXIT_MIN_SKILLS", "12"))
+        self._early_exit_min_categories = int(os.getenv("EARLY_EXIT_MIN_CATEGORIES", "4"))
         
         # Initialize advanced ML models
         self.hf_classifier = None
         self.openai_client = None
+        self.openai_async_client = None
         
         # Enable advanced features
         if TRANSFORMERS_AVAILABLE:
@@ -69,11 +314,14 @@ class SkillExtractor:
         if OPENAI_AVAILABLE:
             self._initialize_openai()
         
+        # Reuses OpenAI extractions for near-duplicate texts (USE_SEMANTIC_CACHE)
+        self.semantic_cache = create_semantic_cache() if self.openai_client else None
+        
         logger.info("NLP engine initialized with advanced features enabled")
     
-    def _load_skill_patterns(self) -> Dict[str, List[str]]:
-        """Load predefined skill patterns for better recognition"""
-        return {
+    def _load_skill_patterns(self) -> Dict[str, List[re.Pattern]]:
+        """Load predefined skill patterns for better recognition, compiled once"""
+        patterns = {
             "programming_languages": [
                 r"\bpython\b", r"\bjava\b", r"\bjavascript\b", r"\bjs\b", r"\btypescript\b", r"\bts\b",
                 r"\bc\+\+\b", r"\bc#\b", r"\bruby\b", r"\bphp\b", r"\bgo\b", r"\brust\b", r"\bswift\b",
@@ -102,6 +350,67 @@ class SkillExtractor:
                 r"\btensorflow\b", r"\bpytorch\b", r"\bkeras\b", r"\bdata analysis\b", r"\bdata visualization\b"
             ]
         }
+        return {
+            category: [re.compile(pattern, re.IGNORECASE) for pattern in category_patterns]
+            for category, category_patterns in patterns.items()
+        }
+    
+    def _build_pattern_matcher(self) -> Tuple[KeywordMatcher, List[re.Pattern]]:
+        """
+        Split the skill patterns into plain whole-word literals and true regexes
+        
+        The literals are matched together in one pass by a KeywordMatcher; the
+        few patterns with real regex syntax (e.g. node.js with an optional dot)
+        are kept as compiled patterns.
+        """
+        literals = []
+        residual_patterns = []
+        for patterns in self.skill_patterns.values():
+            for pattern in patterns:
+                literal_match = _WORD_LITERAL_RE.fullmatch(pattern.pattern)
+                if literal_match:
+                    literals.append(_ESCAPE_RE.sub(r"\1", literal_match.group(1)).lower())
+                else:
+                    residual_patterns.append(pattern)
+        
+        return KeywordMatcher((literal, literal) for literal in literals), residual_patterns
+    
+    def _build_hyperscan_db(self):
+        """Compile every skill pattern into one Hyperscan block-mode database"""
+        try:
+            expressions = [
+                pattern.pattern.encode("utf-8")
+                for patterns in self.skill_patterns.values()
+                for pattern in patterns
+            ]
+            flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=expressions,
+                ids=list(range(len(expressions))),
+                elements=len(expressions),
+                flags=[flags] * len(expressions)
+            )
+            logger.info(f"Compiled {len(expressions)} skill patterns with Hyperscan")
+            return db
+        except Exception as e:
+            logger.warning(f"Failed to compile Hyperscan database, using Python matching: {e}")
+            return None
+    
+    def _scan_patterns_hyperscan(self, text_lower: str) -> Set[str]:
+        """Return the text of every skill pattern match, from a single Hyperscan scan"""
+        scratch = getattr(self._hyperscan_local, "scratch", None)
+        if scratch is None:
+            scratch = self._hyperscan_local.scratch = hyperscan.Scratch(self.hyperscan_db)
+        
+        data = _NON_ASCII_RE.sub(_ascii_stand_in, text_lower).encode("ascii")
+        spans = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            spans.add((start, end))
+        
+        self.hyperscan_db.scan(data, match_event_handler=on_match, scratch=scratch)
+        return {text_lower[start:end].strip() for start, end in spans}
     
     def _load_skill_categories(self) -> Dict[str, str]:
         """Map skills to their categories"""
@@ -143,13 +452,8 @@ class SkillExtractor:
         """Initialize HuggingFace model for advanced classification"""
         try:
             if TRANSFORMERS_AVAILABLE and os.getenv("USE_HUGGINGFACE", "true").lower() == "true":
-                model_name = os.getenv("HUGGINGFACE_MODEL", "facebook/bart-large-mnli")
-                logger.info(f"Loading HuggingFace model: {model_name}")
-                
-                self.hf_classifier = pipeline(
-                    "zero-shot-classification",
-                    model=model_name
-                )
+                model_name = os.getenv("HUGGINGFACE_MODEL", DEFAULT_HF_MODEL)
+                self.hf_classifier = get_hf_classifier(model_name)
                 logger.info("HuggingFace classifier initialized successfully")
             else:
                 self.hf_classifier = None
@@ -164,7 +468,7 @@ class SkillExtractor:
         Ensures valid environment setup and prevents missing authentication errors.
         """
         try:
-            if OPENAI_AVAILABLE and os.getenv("USE_OPENAI", "false").lower() == "true":
+            if OPENAI_AVAILABLE and self._use_openai:
                 api_key = os.getenv("OPENAI_API_KEY")
                 
                 if not api_key or api_key == "your_openai_api_key_here":
@@ -172,8 +476,10 @@ class SkillExtractor:
                     logger.warning("OpenAI API key not configured. Set OPENAI_API_KEY in .env file")
                     return
                 
-                # Initialize using the new SDK client with explicit API key
+                # Initialize using the new SDK client with explicit API key; the async
+                # client lets extract_skills_async overlap the call with local models
                 self.openai_client = openai.OpenAI(api_key=api_key)
+                self.openai_async_client = openai.AsyncOpenAI(api_key=api_key)
                 logger.info("✅ OpenAI client initialized successfully")
             else:
                 self.openai_client = None
@@ -181,41 +487,105 @@ class SkillExtractor:
         except Exception as e:
             logger.error(f"❌ Failed to initialize OpenAI client: {e}")
             self.openai_client = None
+            self.openai_async_client = None
     
-    def extract_skills_spacy(self, text: str) -> Tuple[List[str], Dict[str, float]]:
-        """Extract skills using spaCy NER and pattern matching"""
-        doc = self.nlp(text.lower())
-        detected_skills = set()
-        confidence_scores = {}
+    def _extract_patterns(self, text_lower: str) -> Dict[str, float]:
+        """Skills matched by the predefined patterns, with their confidence"""
+        # One Hyperscan pass over all patterns if available, otherwise one
+        # scan for all literal patterns, then the residual regexes
+        if self.hyperscan_db is not None:
+            pattern_skills = self._scan_patterns_hyperscan(text_lower)
+        else:
+            pattern_skills = self.pattern_matcher.find(text_lower)
+            for pattern in self.residual_patterns:
+                for match in pattern.finditer(text_lower):
+                    pattern_skills.add(match.group().strip())
         
-        # Pattern-based extraction
-        for category, patterns in self.skill_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text.lower(), re.IGNORECASE)
-                for match in matches:
-                    skill = match.group().strip()
-                    detected_skills.add(skill)
-                    # Higher confidence for exact pattern matches
-                    confidence_scores[skill] = 0.8
+        # Higher confidence for exact pattern matches
+        return dict.fromkeys(pattern_skills, 0.8)
+    
+    def _extract_spacy_ner(self, text_lower: str, doc) -> Dict[str, float]:
+        """Skills found in the entities and noun phrases of a Doc parsed from text_lower"""
+        confidence_scores = {}
         
+        # The doc is of text_lower, so entity and chunk texts are slices of it
         # NER-based extraction for technical terms
         for ent in doc.ents:
-            if ent.label_ in ["ORG", "PRODUCT", "LANGUAGE"]:
-                skill_candidate = ent.text.lower().strip()
-                if len(skill_candidate) > 2 and skill_candidate not in ["the", "and", "for"]:
-                    detected_skills.add(skill_candidate)
+            if ent.label_ in SKILL_ENTITY_LABELS:
+                skill_candidate = text_lower[ent.start_char:ent.end_char].strip()
+                if len(skill_candidate) > 2 and skill_candidate not in ENTITY_STOPWORDS:
                     confidence_scores[skill_candidate] = 0.6
         
         # Noun phrase extraction for potential skills
         for chunk in doc.noun_chunks:
-            chunk_text = chunk.text.lower().strip()
-            if len(chunk_text.split()) <= 3 and len(chunk_text) > 2:
+            chunk_text = text_lower[chunk.start_char:chunk.end_char].strip()
+            # Short phrases only (at most 3 words), counted without splitting
+            if chunk_text.count(" ") <= 2 and len(chunk_text) > 2:
                 # Check if it contains technical keywords
-                if any(keyword in chunk_text for keyword in ["development", "programming", "analysis", "design"]):
-                    detected_skills.add(chunk_text)
+                if any(keyword in chunk_text for keyword in NOUN_CHUNK_KEYWORDS):
                     confidence_scores[chunk_text] = 0.4
         
-        return list(detected_skills), confidence_scores
+        return confidence_scores
+    
+    def _needs_ner(self, pattern_scores: Dict[str, float]) -> bool:
+        """Whether to parse the text with spaCy, given what the patterns found"""
+        return self._use_spacy_ner or len(pattern_scores) < self._min_skills_for_ner
+    
+    def extract_skills_spacy(
+        self,
+        text: str,
+        doc=None,
+        pattern_scores: Optional[Dict[str, float]] = None
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Extract skills using pattern matching and, when needed, spaCy NER
+        
+        Args:
+            text: Resume or profile text
+            doc: Already-parsed spaCy Doc of text.lower(), if available
+            pattern_scores: _extract_patterns result for text.lower(), if already computed
+                (extended in place)
+        """
+        text_lower = text.lower()
+        confidence_scores = self._extract_patterns(text_lower) if pattern_scores is None else pattern_scores
+        
+        if self._needs_ner(confidence_scores):
+            if doc is None:
+                doc = self.nlp(text_lower)
+            confidence_scores.update(self._extract_spacy_ner(text_lower, doc))
+        
+        return list(confidence_scores), confidence_scores
+    
+    async def extract_skills_spacy_async(
+        self,
+        text: str,
+        doc=None,
+        parse=None,
+        run=None
+    ) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Async version of extract_skills_spacy
+        
+        Args:
+            text: Resume or profile text
+            doc: Already-parsed spaCy Doc of text.lower(), if available
+            parse: Async callable returning the Doc of a lowercased text (e.g. a
+                micro-batcher's submit), awaited only if NER is needed
+            run: Async callable run(func, *args) that runs blocking work off the
+                event loop (default asyncio.to_thread), e.g. one that caps concurrency
+        """
+        run = run or asyncio.to_thread
+        text_lower = text.lower()
+        confidence_scores = await run(self._extract_patterns, text_lower)
+        
+        if self._needs_ner(confidence_scores):
+            if doc is None:
+                doc = await parse(text_lower) if parse else await run(self.nlp, text_lower)
+            confidence_scores.update(
+                await run(self._extract_spacy_ner, text_lower, doc)
+            )
+        
+        return list(confidence_scores), confidence_scores
     
     def extract_skills_huggingface(self, text: str) -> Tuple[List[str], Dict[str, float]]:
         """Extract skills using HuggingFace zero-shot classification (optimized for speed)"""
@@ -223,21 +593,15 @@ class SkillExtractor:
             return [], {}
         
         try:
-            # Get configuration from environment
-            confidence_threshold = float(os.getenv("HF_CONFIDENCE_THRESHOLD", "0.3"))
+            confidence_threshold = self._hf_threshold
             
-            # OPTIMIZED: Reduced candidate list for faster inference on CPU
-            # Focus on high-level categories and ambiguous terms
-            candidate_skills = [
-                "web development", "frontend development", "backend development", "full stack development",
-                "machine learning", "data science", "data analysis",
-                "cloud computing", "devops practices", "software engineering",
-                "mobile development", "database management", "api development",
-                "agile methodology", "project management", "leadership skills"
-            ]
-            
-            # Classify text against candidate skills
-            result = self.hf_classifier(text[:800], candidate_skills)  # Limit text length
+            # Classify text against candidate skills. BART-MNLI encodes each
+            # text/label pair jointly, so all pairs go through one batched forward pass
+            result = self.hf_classifier(
+                text[:800],  # Limit text length
+                HF_CANDIDATE_SKILLS,
+                batch_size=len(HF_CANDIDATE_SKILLS)
+            )
             
             skills = []
             confidence_scores = {}
@@ -255,7 +619,107 @@ class SkillExtractor:
             
         except Exception as e:
             logger.error(f"HuggingFace extraction failed: {e}")
-            return [], {}
+            return FAILED_EXTRACTION
+    
+    def _lookup_semantic_cache(self, text: str) -> Tuple[Optional[Tuple], Optional[np.ndarray]]:
+        """
+        Look for an earlier, similarly phrased text before paying for an API call
+        
+        Returns:
+            (cached skills and confidence scores or None, embedding to store a new result under or None)
+        """
+        if self.semantic_cache is None:
+            return None, None
+        
+        try:
+            cache_embedding = embed_text(text[:1500])
+            cached_result = self.semantic_cache.query(cache_embedding)
+            if cached_result is not None:
+                logger.info("Serving OpenAI skill extraction from semantic cache")
+                skills, confidence_scores = cached_result
+                return (list(skills), dict(confidence_scores)), cache_embedding
+            return None, cache_embedding
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None, None
+    
+    def _openai_messages(self, text: str) -> List[Dict[str, str]]:
+        """Chat messages asking OpenAI to extract the skills in text"""
+        prompt = f"Text to analyze:\n{text[:1500]}"
+        return [
+            SKILL_EXTRACTION_SYSTEM_MESSAGE,
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _parse_openai_skills(self, response, cache_embedding) -> Tuple[List[str], Dict[str, float]]:
+        """Parse the structured skills output of an OpenAI response, storing it in the semantic cache"""
+        message = response.choices[0].message
+        # Content is empty when the model refuses
+        if not message.content:
+            logger.error(f"❌ OpenAI returned no skills (finish reason: {response.choices[0].finish_reason})")
+            return FAILED_EXTRACTION
+        
+        # The schema guarantees valid JSON unless the output was cut off at max_tokens
+        if response.choices[0].finish_reason == "length":
+            confidence_scores = {
+                json.loads(name): float(confidence)
+                for name, confidence in SKILL_ENTRY_PATTERN.findall(message.content)
+            }
+            logger.warning(
+                f"⚠️ OpenAI output truncated at {self._openai_max_tokens} tokens (MAX_TOKENS_OPENAI), "
+                f"keeping {len(confidence_scores)} complete skills"
+            )
+            # Not stored in any cache, so a later request (or similar text) gets a full answer
+            if not confidence_scores:
+                return FAILED_EXTRACTION
+            return IncompleteExtraction((list(confidence_scores), confidence_scores))
+        
+        try:
+            result_json = json.loads(message.content)
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ OpenAI returned invalid JSON: {e}")
+            logger.error(f"Response text: {message.content[:200]}")
+            return FAILED_EXTRACTION
+        
+        confidence_scores = {
+            entry["name"]: entry["confidence"] for entry in result_json.get("skills", [])
+        }
+        skills = list(confidence_scores)
+        
+        logger.info(f"✅ OpenAI extracted {len(skills)} skills successfully")
+        if cache_embedding is not None:
+            self.semantic_cache.add(cache_embedding, (list(skills), dict(confidence_scores)))
+        return skills, confidence_scores
+    
+    def _openai_retry_delay(self, error: Exception, attempt: int, retries: int) -> Optional[int]:
+        """
+        Seconds to wait before retrying a failed OpenAI call, or None to give up
+        
+        Only rate limits are retried, with exponential backoff: 1s, 2s, 4s.
+        """
+        error_msg = str(error).lower()
+        
+        # Handle specific OpenAI errors
+        if isinstance(error, openai.AuthenticationError):
+            logger.error(f"❌ OpenAI authentication error: {error}")
+            return None
+        
+        elif isinstance(error, openai.RateLimitError) or "rate limit" in error_msg or "429" in error_msg:
+            wait_time = 2 ** attempt
+            logger.warning(f"⚠️ OpenAI rate limit reached. Retrying in {wait_time} seconds... (Attempt {attempt + 1}/{retries})")
+            return wait_time
+        
+        elif isinstance(error, openai.APIConnectionError):
+            logger.error(f"❌ OpenAI connection error: {error}")
+            return None
+        
+        elif isinstance(error, openai.APITimeoutError):
+            logger.error(f"❌ OpenAI timeout error: {error}")
+            return None
+        
+        else:
+            logger.error(f"❌ OpenAI extraction failed: {error}")
+            return None
     
     def extract_skills_openai(self, text: str) -> Tuple[List[str], Dict[str, float]]:
         """
@@ -265,99 +729,70 @@ class SkillExtractor:
         if not self.openai_client:
             return [], {}
         
-        max_tokens = int(os.getenv("MAX_TOKENS_OPENAI", "500"))
         retries = 3
         
-        prompt = f"""You are an expert HR analyst specializing in technical skill extraction from resumes and profiles.
-Analyze the following text and extract ALL technical skills, programming languages, frameworks, 
-tools, databases, cloud platforms, and relevant professional skills.
-
-For each skill, assign a confidence score from 0.1 to 1.0 based on:
-- How explicitly mentioned it is
-- Context and depth of experience indicated
-- Number of occurrences and variations
-
-Text to analyze:
-{text[:1500]}
-
-Return ONLY valid JSON in this exact format:
-{{
-    "skills": ["skill1", "skill2", "skill3"],
-    "confidence_scores": {{"skill1": 0.9, "skill2": 0.7, "skill3": 0.8}}
-}}
-
-Include skills from these categories:
-- Programming languages (Python, Java, JavaScript, etc.)
-- Web frameworks (React, Django, Express, etc.)
-- Databases (MySQL, MongoDB, PostgreSQL, etc.)
-- Cloud platforms (AWS, Azure, GCP, etc.)
-- DevOps tools (Docker, Kubernetes, Jenkins, etc.)
-- Data science tools (pandas, numpy, TensorFlow, etc.)
-- Soft skills (leadership, communication, etc.)"""
+        cached_result, cache_embedding = self._lookup_semantic_cache(text)
+        if cached_result is not None:
+            return cached_result
         
         # Retry loop for rate-limit handling with exponential backoff
         for attempt in range(retries):
             try:
                 response = self.openai_client.chat.completions.create(
                     model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "You are a technical skill extraction expert. Return only valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.2
+                    messages=self._openai_messages(text),
+                    max_tokens=self._openai_max_tokens,
+                    temperature=0.2,
+                    response_format=SKILL_EXTRACTION_RESPONSE_FORMAT
                 )
-                
-                # Parse response safely
-                result_text = response.choices[0].message.content.strip()
-                
-                # Remove markdown code blocks if present
-                if result_text.startswith("```json"):
-                    result_text = result_text.replace("```json", "").replace("```", "").strip()
-                elif result_text.startswith("```"):
-                    result_text = result_text.replace("```", "").strip()
-                
-                result_json = json.loads(result_text)
-                skills = result_json.get("skills", [])
-                confidence_scores = result_json.get("confidence_scores", {})
-                
-                logger.info(f"✅ OpenAI extracted {len(skills)} skills successfully")
-                return skills, confidence_scores
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ OpenAI returned invalid JSON: {e}")
-                logger.error(f"Response text: {result_text[:200]}")
-                return [], {}
+                return self._parse_openai_skills(response, cache_embedding)
                 
             except Exception as e:
-                import time
-                error_msg = str(e).lower()
+                wait_time = self._openai_retry_delay(e, attempt, retries)
+                if wait_time is None:
+                    return FAILED_EXTRACTION
+                time.sleep(wait_time)
+        
+        logger.error("❌ Max retries exceeded while calling OpenAI API")
+        return FAILED_EXTRACTION
+    
+    async def extract_skills_openai_async(self, text: str, run=None) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Async version of extract_skills_openai, using the AsyncOpenAI client
+        
+        run runs blocking work off the event loop, as in extract_skills_spacy_async.
+        """
+        if not self.openai_async_client:
+            return [], {}
+        
+        run = run or asyncio.to_thread
+        retries = 3
+        
+        # Embedding the text for the semantic cache is CPU work
+        cached_result, cache_embedding = await run(self._lookup_semantic_cache, text)
+        if cached_result is not None:
+            return cached_result
+        
+        for attempt in range(retries):
+            try:
+                response = await self.openai_async_client.chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=self._openai_messages(text),
+                    max_tokens=self._openai_max_tokens,
+                    temperature=0.2,
+                    response_format=SKILL_EXTRACTION_RESPONSE_FORMAT
+                )
+                # Parsing also adds to the semantic cache, which shouldn't block the event loop
+                return await run(self._parse_openai_skills, response, cache_embedding)
                 
-                # Handle specific OpenAI errors
-                if isinstance(e, openai.AuthenticationError):
-                    logger.error(f"❌ OpenAI authentication error: {e}")
-                    return [], {}
-                    
-                elif isinstance(e, openai.RateLimitError) or "rate limit" in error_msg or "429" in error_msg:
-                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                    logger.warning(f"⚠️ OpenAI rate limit reached. Retrying in {wait_time} seconds... (Attempt {attempt + 1}/{retries})")
-                    time.sleep(wait_time)
-                    continue
-                    
-                elif isinstance(e, openai.APIConnectionError):
-                    logger.error(f"❌ OpenAI connection error: {e}")
-                    return [], {}
-                    
-                elif isinstance(e, openai.APITimeoutError):
-                    logger.error(f"❌ OpenAI timeout error: {e}")
-                    return [], {}
-                    
-                else:
-                    logger.error(f"❌ OpenAI extraction failed: {e}")
-                    return [], {}
+            except Exception as e:
+                wait_time = self._openai_retry_delay(e, attempt, retries)
+                if wait_time is None:
+                    return FAILED_EXTRACTION
+                await asyncio.sleep(wait_time)
         
         logger.error("❌ Max retries exceeded while calling OpenAI API")
-        return [], {}
+        return FAILED_EXTRACTION
     
     def categorize_skills(self, skills: List[str]) -> Dict[str, List[str]]:
         """Categorize extracted skills into predefined categories"""
@@ -369,56 +804,59 @@ Include skills from these categories:
             
             # Try partial matching for compound skills
             if category == "Other":
-                for known_skill, cat in self.skill_categories.items():
-                    if known_skill in skill_lower or skill_lower in known_skill:
-                        category = cat
-                        break
+                category = self._match_partial_category(skill_lower)
             
             categorized[category].append(skill)
         
         return dict(categorized)
     
-    def extract_skills(self, text: str, use_all_methods: bool = True) -> Dict:
+    def _build_known_substring_index(self) -> Dict[str, int]:
+        """Map every substring of a known skill to the index of the first known skill containing it"""
+        substring_index = {}
+        for index, known_skill in enumerate(self._known_skills):
+            for start in range(len(known_skill) + 1):
+                for end in range(start, len(known_skill) + 1):
+                    substring_index.setdefault(known_skill[start:end], index)
+        return substring_index
+    
+    def _match_partial_category(self, skill_lower: str) -> str:
         """
-        Main method to extract skills using optimized hybrid approach
+        Category of the first known skill that contains or is contained in skill_lower
         
-        Args:
-            text: Resume or profile text
-            use_all_methods: Whether to use all available NLP methods
-            
-        Returns:
-            Dict with skills, categories, and confidence scores
+        Known skills inside skill_lower come from one matcher scan, and known
+        skills containing skill_lower from one dict lookup.
+        """
+        best = min(
+            self._known_skill_matcher.find_values(skill_lower),
+            default=len(self._known_skills)
+        )
+        best = min(best, self._known_substring_index.get(skill_lower, best))
+        
+        if best == len(self._known_skills):
+            return "Other"
+        return self.skill_categories[self._known_skills[best]]
+    
+    def _combine_results(self, method_results: List[Tuple[List[str], Dict[str, float]]]) -> Dict:
+        """
+        Merge (skills, confidence scores) from each extraction method into the final result
+        
+        The first entry is the spaCy result; later methods only raise a
+        skill's confidence (take higher value).
         """
         all_skills = set()
         all_confidence_scores = {}
         
-        # Method 1: spaCy + regex (always available, fast, accurate for known skills)
-        spacy_skills, spacy_confidence = self.extract_skills_spacy(text)
+        spacy_skills, spacy_confidence = method_results[0]
         all_skills.update(spacy_skills)
         all_confidence_scores.update(spacy_confidence)
         
-        if use_all_methods:
-            # Method 2: HuggingFace (optimized - only for high-level categories)
-            # This complements spaCy by identifying broader skill categories
-            if self.hf_classifier:
-                hf_skills, hf_confidence = self.extract_skills_huggingface(text)
-                all_skills.update(hf_skills)
-                # Merge confidence scores (take higher value)
-                for skill, conf in hf_confidence.items():
-                    all_confidence_scores[skill] = max(
-                        all_confidence_scores.get(skill, 0), conf
-                    )
-            
-            # Method 3: OpenAI (if available and API key set) - disabled by default for speed
-            # Only enable if USE_OPENAI=true and you need GPT-level understanding
-            if self.openai_client and os.getenv("USE_OPENAI", "false").lower() == "true":
-                openai_skills, openai_confidence = self.extract_skills_openai(text)
-                all_skills.update(openai_skills)
-                # Merge confidence scores (take higher value)
-                for skill, conf in openai_confidence.items():
-                    all_confidence_scores[skill] = max(
-                        all_confidence_scores.get(skill, 0), conf
-                    )
+        for skills, confidence_scores in method_results[1:]:
+            all_skills.update(skills)
+            # Merge confidence scores (take higher value)
+            for skill, conf in confidence_scores.items():
+                all_confidence_scores[skill] = max(
+                    all_confidence_scores.get(skill, 0), conf
+                )
         
         # Convert to list and categorize
         final_skills = list(all_skills)
@@ -437,6 +875,168 @@ Include skills from these categories:
             "total_skills": len(final_skills),
             "categories_count": len(categorized_skills)
         }
+    
+    def _spacy_result_suffices(self, spacy_result: Tuple[List[str], Dict[str, float]]) -> bool:
+        """Whether the spaCy skills are plentiful and broad enough to skip the slower methods"""
+        spacy_skills, spacy_confidence = spacy_result
+        high_confidence = sum(1 for conf in spacy_confidence.values() if conf >= 0.8)
+        if high_confidence < self._early_exit_min_skills:
+            return False
+        
+        covered_categories = len(self.categorize_skills(spacy_skills).keys() - {"Other"})
+        if covered_categories < self._early_exit_min_categories:
+            return False
+        
+        logger.info(
+            f"spaCy found {high_confidence} high-confidence skills in {covered_categories} "
+            "categories, skipping HuggingFace and OpenAI"
+        )
+        return True
+    
+    def _get_cached_result(self, cache_key) -> Optional[Dict]:
+        cached_result = self._result_cache.get(cache_key)
+        # Copy so callers can't modify the cached lists and dicts
+        return copy.deepcopy(cached_result) if cached_result is not None else None
+    
+    def has_cached_result(self, text: str, use_all_methods: bool = True) -> bool:
+        """
+        Whether the result for text is in the result cache
+        
+        Results of runs where a method failed or was truncated are never cached, so callers keeping
+        their own cache of extract_skills output can use this to skip those too.
+        """
+        return self._result_cache.get((text_digest(text), use_all_methods)) is not None
+    
+    def _cache_result(self, cache_key, result: Dict, method_results: List[Tuple[List[str], Dict[str, float]]]):
+        # A failed or truncated method's skills are missing from the result, so let the next request retry it
+        if any(isinstance(method_result, IncompleteExtraction) for method_result in method_results):
+            return
+        self._result_cache.set(cache_key, copy.deepcopy(result))
+    
+    def extract_skills(
+        self,
+        text: str,
+        use_all_methods: bool = True,
+        doc=None,
+        pattern_scores: Optional[Dict[str, float]] = None
+    ) -> Dict:
+        """
+        Main method to extract skills using optimized hybrid approach
+        
+        Args:
+            text: Resume or profile text
+            use_all_methods: Whether to use all available NLP methods
+            doc: Already-parsed spaCy Doc of text.lower(), e.g. from a batched nlp.pipe
+            pattern_scores: Pattern-matching scores for text.lower(), passed on to extract_skills_spacy
+            
+        Returns:
+            Dict with skills, categories, and confidence scores
+        """
+        cache_key = (text_digest(text), use_all_methods)
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        # Method 1: spaCy + regex (always available, fast, accurate for known skills)
+        method_results = [self.extract_skills_spacy(text, doc=doc, pattern_scores=pattern_scores)]
+        
+        if use_all_methods and not self._spacy_result_suffices(method_results[0]):
+            # Method 2: HuggingFace (optimized - only for high-level categories)
+            # This complements spaCy by identifying broader skill categories
+            if self.hf_classifier:
+                method_results.append(self.extract_skills_huggingface(text))
+            
+            # Method 3: OpenAI (if available and API key set) - disabled by default for speed
+            # Only enable if USE_OPENAI=true and you need GPT-level understanding
+            if self.openai_client and self._use_openai:
+                method_results.append(self.extract_skills_openai(text))
+        
+        result = self._combine_results(method_results)
+        self._cache_result(cache_key, result, method_results)
+        return result
+    
+    async def extract_skills_async(
+        self,
+        text: str,
+        use_all_methods: bool = True,
+        doc=None,
+        parse=None,
+        run=None
+    ) -> Dict:
+        """
+        Async version of extract_skills that runs the slower extraction methods concurrently
+        
+        HuggingFace runs in a worker thread while the OpenAI call is awaited, so
+        their latency is that of the slower one rather than the sum.
+        parse and run are passed on to extract_skills_spacy_async; every blocking
+        step (patterns, NER, HuggingFace, embedding, merging) goes through run.
+        """
+        run = run or asyncio.to_thread
+        cache_key = (text_digest(text), use_all_methods)
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        # spaCy goes first: it is fast (usually just the pattern scan on skill-rich
+        # texts) and decides whether the slower methods run at all
+        method_results = [await self.extract_skills_spacy_async(text, doc=doc, parse=parse, run=run)]
+        
+        tasks = []
+        if use_all_methods and not self._spacy_result_suffices(method_results[0]):
+            if self.hf_classifier:
+                tasks.append(run(self.extract_skills_huggingface, text))
+            if self.openai_async_client and self._use_openai:
+                tasks.append(self.extract_skills_openai_async(text, run=run))
+        
+        method_results.extend(await asyncio.gather(*tasks))
+        # Categorizing is CPU work too
+        result = await run(self._combine_results, method_results)
+        self._cache_result(cache_key, result, method_results)
+        return result
+    
+    def extract_skills_batch(
+        self,
+        texts: List[str],
+        use_all_methods: bool = True,
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Extract skills from many texts, parsing them together with nlp.pipe
+        
+        Args:
+            texts: Resume or profile texts
+            use_all_methods: Whether to use all available NLP methods
+            batch_size: Documents per nlp.pipe batch (default SPACY_BATCH_SIZE)
+            n_process: Worker processes for parsing (default SPACY_N_PROCESS)
+            
+        Returns:
+            One extract_skills result dict per text, in the same order
+        """
+        results = [
+            self._get_cached_result((text_digest(text), use_all_methods)) for text in texts
+        ]
+        
+        # Cached texts are neither scanned nor parsed; the rest are scanned once,
+        # and only those that will use NER are parsed
+        pending = [index for index, result in enumerate(results) if result is None]
+        texts_lower = {index: texts[index].lower() for index in pending}
+        pattern_scores = {index: self._extract_patterns(texts_lower[index]) for index in pending}
+        needs_doc = {index for index in pending if self._needs_ner(pattern_scores[index])}
+        docs = self.nlp.pipe(
+            (texts_lower[index] for index in pending if index in needs_doc),
+            batch_size=batch_size or SPACY_BATCH_SIZE,
+            n_process=n_process or SPACY_N_PROCESS
+        )
+        
+        for index in pending:
+            results[index] = self.extract_skills(
+                texts[index],
+                use_all_methods=use_all_methods,
+                doc=next(docs) if index in needs_doc else None,
+                pattern_scores=pattern_scores[index]
+            )
+        return results
 
 class JobRoleMatcher:
     """
@@ -451,10 +1051,7 @@ class JobRoleMatcher:
 
         if TRANSFORMERS_AVAILABLE and os.getenv("USE_HUGGINGFACE", "false").lower() == "true":
             try:
-                self.role_classifier = pipeline(
-                    "zero-shot-classification",
-                    model="facebook/bart-large-mnli"
-                )
+                self.role_classifier = get_hf_classifier()
                 logger.info("Advanced role classifier initialized")
             except Exception as e:
                 logger.warning(f"Failed to load role classifier: {e}")
@@ -463,6 +1060,8 @@ class JobRoleMatcher:
             self.role_classifier = None
             logger.info("Role classifier disabled or transformers unavailable")
         
+        self._build_role_matrix()
+        
         logger.info("Job role matcher initialized with advanced ML features")
     
     def _load_job_skill_mapping(self) -> Dict[str, List[str]]:
@@ -494,24 +1093,53 @@ class JobRoleMatcher:
             ]
         }
     
-    def calculate_role_fit(self, user_skills: List[str], target_role: str) -> Dict:
-        """Calculate how well user skills match a target role"""
-        required_skills = self.job_skill_mapping.get(target_role, [])
+    def _build_role_matrix(self):
+        """
+        Number every distinct required skill and record which roles require it
         
-        if not required_skills:
-            return {"fit_percentage": 0, "missing_skills": [], "matching_skills": []}
+        Row i of _role_skill_matrix counts how often role i requires each
+        vocabulary skill, so one matrix-vector product scores every role.
+        """
+        self._roles = list(self.job_skill_mapping)
+        self._role_index = {role: index for index, role in enumerate(self._roles)}
+        self._role_required_skills = [
+            [skill.lower() for skill in required_skills]
+            for required_skills in self.job_skill_mapping.values()
+        ]
+        self._role_required_sets = [frozenset(required_skills) for required_skills in self._role_required_skills]
+        self._skill_vocabulary = list(dict.fromkeys(
+            skill for required_skills in self._role_required_skills for skill in required_skills
+        ))
+        self._skill_vocabulary_set = frozenset(self._skill_vocabulary)
+        self._skill_ids = {skill: index for index, skill in enumerate(self._skill_vocabulary)}
         
+        self._role_skill_matrix = np.zeros((len(self._roles), len(self._skill_vocabulary)), dtype=np.int32)
+        for role_index, required_skills in enumerate(self._role_required_skills):
+            for skill in required_skills:
+                self._role_skill_matrix[role_index, self._skill_ids[skill]] += 1
+        self._required_counts = self._role_skill_matrix.sum(axis=1)
+    
+    def _match_skills(self, user_skills: List[str], candidates: frozenset) -> Set[str]:
+        """Return the candidate skills that a user skill equals, contains or is contained in"""
         user_skills_lower = [skill.lower() for skill in user_skills]
-        required_skills_lower = [skill.lower() for skill in required_skills]
+        matched = set(candidates.intersection(user_skills_lower))
         
-        matching_skills = []
-        for req_skill in required_skills_lower:
-            for user_skill in user_skills_lower:
-                if req_skill in user_skill or user_skill in req_skill:
-                    matching_skills.append(req_skill)
-                    break
+        # Substring matching only for candidates the exact intersection missed
+        matched.update(
+            skill for skill in candidates - matched
+            if any(skill in user_skill or user_skill in skill for user_skill in user_skills_lower)
+        )
+        return matched
+    
+    def _role_fit(self, role_index: int, matched: Set[str]) -> Dict:
+        """Build the fit details of one role from the matched required skills"""
+        required_skills = self._role_required_skills[role_index]
+        if not required_skills:
+            return {"fit_percentage": 0, "missing_skills": [], "matching_skills": []}
         
-        missing_skills = [skill for skill in required_skills_lower if skill not in matching_skills]
+        # Lists keep the role's own skill order
+        matching_skills = [skill for skill in required_skills if skill in matched]
+        missing_skills = [skill for skill in required_skills if skill not in matched]
         fit_percentage = (len(matching_skills) / len(required_skills)) * 100
         
         return {
@@ -522,21 +1150,43 @@ class JobRoleMatcher:
             "total_matching": len(matching_skills)
         }
     
+    def calculate_role_fit(self, user_skills: List[str], target_role: str) -> Dict:
+        """Calculate how well user skills match a target role"""
+        role_index = self._role_index.get(target_role)
+        
+        if role_index is None:
+            return {"fit_percentage": 0, "missing_skills": [], "matching_skills": []}
+        
+        matched = self._match_skills(user_skills, self._role_required_sets[role_index])
+        return self._role_fit(role_index, matched)
+    
     def suggest_best_roles(self, user_skills: List[str], top_n: int = 5) -> List[Dict]:
         """Suggest best matching job roles for user skills"""
-        role_fits = []
+        matched = self._match_skills(user_skills, self._skill_vocabulary_set)
+        matched_vector = np.fromiter(
+            (skill in matched for skill in self._skill_vocabulary),
+            dtype=bool,
+            count=len(self._skill_vocabulary)
+        )
         
-        for role in self.job_skill_mapping.keys():
-            fit_data = self.calculate_role_fit(user_skills, role)
-            role_fits.append({
-                "role": role,
-                **fit_data
-            })
+        # Score every role at once; roles requiring nothing score 0
+        match_counts = self._role_skill_matrix @ matched_vector
+        fit_percentages = np.divide(
+            match_counts, self._required_counts,
+            out=np.zeros(len(self._roles)), where=self._required_counts > 0
+        ) * 100
         
-        # Sort by fit percentage
-        role_fits.sort(key=lambda x: x["fit_percentage"], reverse=True)
+        # Sort by fit percentage (stable, so ties keep the mapping's order)
+        ranked = sorted(
+            range(len(self._roles)),
+            key=lambda index: round(float(fit_percentages[index]), 2),
+            reverse=True
+        )
         
-        return role_fits[:top_n]
+        return [
+            {"role": self._roles[index], **self._role_fit(index, matched)}
+            for index in ranked[:top_n]
+        ]
 
 # Factory function to create skill extractor
 def create_skill_extractor(spacy_model: str = "en_core_web_sm") -> SkillExtractor:
@@ -0,0 +1,215 @@
+"""
+Semantic Cache
+Reuses results for inputs whose embeddings are close to an earlier input's
+"""
+
+import functools
+import logging
+import os
+import pickle
+import threading
+from typing import Any, List, Optional
+
+# Optional imports - the cache is disabled unless numpy and sentence-transformers are installed
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# Optional faiss index; without it the lookup is a NumPy matrix-vector product
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_MODEL = os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+# Minimum cosine similarity for two inputs to share a result
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "10000"))
+# Pickle file the cache is loaded from and saved to, for warm starts
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH")
+# Number of adds between background saves to SEMANTIC_CACHE_PATH
+SEMANTIC_CACHE_SAVE_INTERVAL = int(os.getenv("SEMANTIC_CACHE_SAVE_INTERVAL", "50"))
+# Initial capacity of the vector array; it doubles as needed, up to max_size
+INITIAL_CAPACITY = 64
+
+
+@functools.lru_cache(maxsize=None)
+def get_sentence_encoder(model_name: str = SEMANTIC_CACHE_MODEL):
+    """Return the shared sentence encoder for a model, loading it on first use"""
+    logger.info(f"Loading sentence encoder: {model_name}")
+    return SentenceTransformer(model_name)
+
+
+def embed_text(text: str, model_name: str = SEMANTIC_CACHE_MODEL) -> "np.ndarray":
+    """Embed text as an L2-normalized float32 vector, so inner product is cosine similarity"""
+    embedding = get_sentence_encoder(model_name).encode(text, normalize_embeddings=True)
+    return np.asarray(embedding, dtype=np.float32)
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over normalized embeddings
+
+    query() returns the value stored for the most similar earlier embedding
+    if its cosine similarity reaches the threshold. Entries are evicted
+    oldest first, a tenth of max_size at a time, once max_size is reached.
+    Vectors live in a preallocated array that doubles when full, and the
+    cache is written to path from a background thread every save_interval
+    adds (and by save(), e.g. on shutdown).
+    """
+
+    def __init__(
+        self,
+        max_size: int = SEMANTIC_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        path: Optional[str] = SEMANTIC_CACHE_PATH,
+        save_interval: int = SEMANTIC_CACHE_SAVE_INTERVAL
+    ):
+        """
+        Args:
+            max_size: Most entries kept before the oldest are evicted
+            threshold: Default minimum cosine similarity for a hit
+            path: Pickle file to load from and save to, or None to keep the cache in memory
+            save_interval: Adds between background saves to path
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.path = path
+        self.save_interval = save_interval
+        # Rows past len(_values) are unused capacity
+        self._vectors: Optional["np.ndarray"] = None
+        self._values: List[Any] = []
+        self._index = None
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        # Held while writing path, so saves don't overlap
+        self._save_lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def _build_index(self):
+        """Build a faiss inner-product index over the stored vectors, if faiss is installed"""
+        if not FAISS_AVAILABLE or self._vectors is None:
+            return None
+        index = faiss.IndexFlatIP(self._vectors.shape[1])
+        index.add(self._vectors[:len(self._values)])
+        return index
+
+    def query(self, embedding: "np.ndarray", threshold: Optional[float] = None) -> Optional[Any]:
+        """Return the value of the closest cached embedding, or None if none is similar enough"""
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            if not self._values:
+                return None
+
+            if self._index is not None:
+                scores, ids = self._index.search(embedding.reshape(1, -1), 1)
+                best, score = int(ids[0][0]), float(scores[0][0])
+            else:
+                similarities = self._vectors[:len(self._values)] @ embedding
+                best = int(similarities.argmax())
+                score = float(similarities[best])
+
+            return self._values[best] if best >= 0 and score >= threshold else None
+
+    def add(self, embedding: "np.ndarray", value: Any) -> None:
+        """Store a value under an embedding, evicting the oldest entries when full"""
+        vector = embedding.reshape(1, -1).astype(np.float32)
+        with self._lock:
+            if len(self._values) >= self.max_size:
+                self._evict(len(self._values) - self.max_size + max(1, self.max_size // 10))
+
+            size = len(self._values)
+            if self._vectors is None:
+                self._vectors = np.empty((min(INITIAL_CAPACITY, self.max_size), vector.shape[1]), dtype=np.float32)
+                self._vectors[0] = vector[0]
+                self._values.append(value)
+                self._index = self._build_index()
+            else:
+                if size == len(self._vectors):
+                    grown = np.empty((min(size * 2, self.max_size), vector.shape[1]), dtype=np.float32)
+                    grown[:size] = self._vectors[:size]
+                    self._vectors = grown
+                self._vectors[size] = vector[0]
+                self._values.append(value)
+                if self._index is not None:
+                    self._index.add(vector)
+
+            self._unsaved += 1
+            save_due = (
+                bool(self.path) and self._unsaved >= self.save_interval and not self._save_lock.locked()
+            )
+
+        if save_due:
+            threading.Thread(target=self.save, name="semantic-cache-save", daemon=True).start()
+
+    def _evict(self, count: int):
+        """Drop the count oldest entries (caller holds the lock)"""
+        size = len(self._values)
+        self._vectors[:size - count] = self._vectors[count:size]
+        del self._values[:count]
+        # Flat indexes are cheap to rebuild, and evicting in chunks keeps this rare
+        self._index = self._build_index()
+
+    def save(self):
+        """Write the cache to path atomically, if anything changed since the last save"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._unsaved:
+                    return
+                # Snapshot under the lock, pickle outside it so adds and queries aren't held up
+                vectors = None if self._vectors is None else self._vectors[:len(self._values)].copy()
+                values = list(self._values)
+                self._unsaved = 0
+
+            temp_path = f"{self.path}.tmp"
+            try:
+                with open(temp_path, "wb") as cache_file:
+                    pickle.dump((vectors, values), cache_file)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Failed to save semantic cache to {self.path}: {e}")
+
+    def _load(self):
+        """Restore the cache from path"""
+        try:
+            with open(self.path, "rb") as cache_file:
+                self._vectors, self._values = pickle.load(cache_file)
+            if self._vectors is not None:
+                self._vectors = np.ascontiguousarray(self._vectors, dtype=np.float32)
+            self._index = self._build_index()
+            logger.info(f"Loaded {len(self._values)} semantic cache entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"Failed to load semantic cache from {self.path}: {e}")
+            self._vectors, self._values, self._index = None, [], None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def create_semantic_cache() -> Optional[SemanticCache]:
+    """Create a SemanticCache if USE_SEMANTIC_CACHE is set and its dependencies are installed"""
+    if os.getenv("USE_SEMANTIC_CACHE", "false").lower() != "true":
+        return None
+
+    if not (NUMPY_AVAILABLE and SENTENCE_TRANSFORMERS_AVAILABLE):
+        logger.warning("USE_SEMANTIC_CACHE is set but sentence-transformers is not installed")
+        return None
+
+    if not FAISS_AVAILABLE:
+        logger.info("faiss not available, semantic cache will use NumPy search")
+    return SemanticCache()
@@ -0,0 +1,126 @@
+"""
+spaCy Micro-Batcher
+Collects documents from concurrent requests and parses them with one nlp.pipe call
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Most documents parsed per nlp.pipe call, and how long to wait for a batch to fill
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "32"))
+SPACY_BATCH_WINDOW_MS = float(os.getenv("SPACY_BATCH_WINDOW_MS", "10"))
+
+
+class SpacyBatcher:
+    """
+    Micro-batching front end for a spaCy pipeline
+
+    Texts submitted within a short window (or until the batch is full) are
+    parsed together with nlp.pipe in a worker thread, which amortizes
+    spaCy's per-call overhead across concurrent requests and keeps parsing
+    off the event loop.
+    """
+
+    def __init__(
+        self,
+        nlp: Any,
+        batch_size: int = SPACY_BATCH_SIZE,
+        window_ms: float = SPACY_BATCH_WINDOW_MS
+    ):
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.window = window_ms / 1000
+        self._queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+
+    async def submit(self, text: str) -> Any:
+        """Parse text with the pipeline, batched with other pending texts"""
+        # The queue and worker are created on first use so they bind to the running loop
+        if self._worker is None or self._worker.done():
+            # Nothing will read the old queue any more, so don't leave its callers waiting
+            self._fail_pending([], RuntimeError("spaCy batcher worker stopped"))
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def close(self):
+        """Stop the background worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> List[Tuple[str, asyncio.Future]]:
+        """
+        Wait for one item, then gather more until the batch is full or the window closes
+
+        Items are appended to batch as they arrive, so the caller still has them
+        if the wait is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Skip callers that gave up while waiting
+        return [(text, future) for text, future in batch if not future.done()]
+
+    def _fail_pending(self, batch: List[Tuple[str, asyncio.Future]], error: BaseException):
+        """Fail the futures of batch and of every item still queued"""
+        pending = list(batch)
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        """Worker loop: parse each collected batch and resolve its futures"""
+        batch: List[Tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = []
+                batch = await self._collect_batch(batch)
+                if not batch:
+                    continue
+
+                texts = [text for text, _ in batch]
+                try:
+                    docs = await asyncio.to_thread(
+                        lambda: list(self.nlp.pipe(texts, batch_size=self.batch_size))
+                    )
+                except Exception as e:
+                    logger.error(f"spaCy batch of {len(texts)} failed: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for (_, future), doc in zip(batch, docs):
+                    if not future.done():
+                        future.set_result(doc)
+        except asyncio.CancelledError:
+            # Callers still waiting would otherwise hang once this worker is gone
+            self._fail_pending(batch, RuntimeError("spaCy batcher closed"))
+            raise
+        except Exception as e:
+            logger.error(f"spaCy batcher worker failed: {e}")
+            self._fail_pending(batch, e)
@@ -49,7 +49,8 @@ router.post('/message', async (req, res, next) => {
     const aiResponse = await aiService.generateChatResponse({
       message,
       history: formattedHistory,
-      userProfile: session.userProfile
+      userProfile: session.userProfile,
+      sessionId: session.id
     });
 
     // Add AI response to history
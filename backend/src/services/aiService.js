@@ -97,14 +97,15 @@ class AIService {
    * @param {Object} params.userProfile - User profile
    * @returns {Promise<Object>} - AI response
    */
-  async generateChatResponse({ message, history = [], userProfile = {} }) {
+  async generateChatResponse({ message, history = [], userProfile = {}, sessionId }) {
     try {
       const response = await axios.post(
         `${this.baseURL}/chat`,
         {
           message,
           history,
-          userProfile
+          userProfile,
+          sessionId
         },
         {
           timeout: this.timeout,